@@ -1,163 +1,332 @@
 import os
 import json
-import time
+import logging
+import signal
+import hashlib
+import tempfile
+import threading
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+from watchdog.observers.polling import PollingObserver
+from watchdog.events import PatternMatchingEventHandler
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # orjson is an optional speedup; stdlib json works the same here
+    orjson = None
+
+# Both parsers accept bytes, so the file can be read without a text decode pass
+_json_loads = orjson.loads if orjson else json.loads
+
+# Quiet period after the last event before a cookie file is converted
+DEBOUNCE_SECONDS = 0.3
+
+# Poll interval used only when the native backend (inotify/FSEvents/ReadDirectoryChangesW)
+# can't be started, e.g. on network filesystems or when inotify watches are exhausted
+POLL_INTERVAL_SECONDS = 5
+
+# x.com cookies are mirrored onto twitter.com; domains are dot-prefixed by then
+_X_SUFFIX = '.x.com'
+_X_HOST_LEN = len('x.com')
+
+def _expiration_str(expiration_raw) -> str:
+    """Render a cookie expiry (epoch seconds as int, float or string) for cookies.txt"""
+    if not expiration_raw:
+        return '0'
+    try:
+        return str(int(expiration_raw))  # fast path: most exports store whole seconds
+    except (ValueError, TypeError, OverflowError):  # Infinity/1e400 from stdlib json overflow
+        pass
+    try:
+        return str(int(float(expiration_raw)))
+    except (ValueError, TypeError, OverflowError):
+        return '0'
+
+def _atomic_write(path: str, data: bytes):
+    """Write data to path via a temp file + os.replace so readers never see a partial file"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
 
 def convert_raw_cookies_to_netscape(raw_cookies_path: str, output_path: str = 'cookies.txt') -> bool:
     """Convert raw_cookies.json to Netscape format cookies.txt"""
     try:
-        with open(raw_cookies_path, 'r', encoding='utf-8') as f:
-            cookies_data = json.load(f)
+        with open(raw_cookies_path, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        logger.error("❌ Error reading %s: %s", raw_cookies_path, e)
+        return False
+    
+    return convert_raw_cookies_bytes(data, output_path)
+
+def convert_raw_cookies_bytes(data: bytes, output_path: str = 'cookies.txt') -> bool:
+    """Convert raw cookies JSON content (already read from disk) to Netscape format"""
+    try:
+        cookies_data = _json_loads(data)
+    except ValueError as e:  # JSONDecodeError (orjson's subclasses it), or non-UTF-8 bytes
+        logger.error("❌ JSON decode error: %s", e)
+        return False
+    
+    # Handle both direct array and object with cookies property
+    if isinstance(cookies_data, dict) and 'cookies' in cookies_data:
+        cookies = cookies_data['cookies']
+    elif isinstance(cookies_data, list):
+        cookies = cookies_data
+    else:
+        logger.error("❌ Invalid cookie format. Expected array or object with 'cookies' property")
+        return False
+    
+    return convert_raw_cookies_list_to_netscape(cookies, output_path)
+
+def convert_raw_cookies_list_to_netscape(cookies, output_path: str = 'cookies.txt') -> bool:
+    """Write an iterable of browser-exported cookie dicts to a Netscape cookies.txt"""
+    try:
+        # Build the whole file in memory and emit it with a single write
+        lines = [
+            "# Netscape HTTP Cookie File\n",
+            "# This is a generated file! Do not edit.\n\n",
+        ]
         
-        # Handle both direct array and object with cookies property
-        if isinstance(cookies_data, dict) and 'cookies' in cookies_data:
-            cookies = cookies_data['cookies']
-        elif isinstance(cookies_data, list):
-            cookies = cookies_data
-        else:
-            print("❌ Invalid cookie format. Expected array or object with 'cookies' property")
-            return False
+        lines_append = lines.append
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write("# Netscape HTTP Cookie File\n")
-            f.write("# This is a generated file! Do not edit.\n\n")
+        total = 0
+        cookie_count = 0
+        for cookie in cookies:
+            total += 1
+            get = cookie.get  # bind once; the loop does up to 8 lookups per cookie
             
-            cookie_count = 0
-            for cookie in cookies:
-                domain = cookie.get('domain', '')
-                # Handle both x.com and twitter.com domains
-                if domain and not domain.startswith('.'):
-                    domain = '.' + domain
-                
-                flag = 'TRUE' if domain.startswith('.') else 'FALSE'
-                path = cookie.get('path', '/')
-                secure = 'TRUE' if cookie.get('secure', False) else 'FALSE'
-                
-                # Handle expiration date safely
-                expiration_raw = cookie.get('expirationDate', cookie.get('expires', 0))
-                try:
-                    expiration = str(int(float(expiration_raw))) if expiration_raw else '0'
-                except (ValueError, TypeError):
-                    expiration = '0'
-                
-                name = cookie.get('name', '')
-                value = cookie.get('value', '')
-                
-                if name and value and domain:  # Only save valid cookies
-                    # Save for x.com domain
-                    f.write(f"{domain}\t{flag}\t{path}\t{secure}\t{expiration}\t{name}\t{value}\n")
-                    cookie_count += 1
-                    
-                    # Also save for twitter.com domain for compatibility
-                    if 'x.com' in domain:
-                        twitter_domain = domain.replace('x.com', 'twitter.com')
-                        f.write(f"{twitter_domain}\t{flag}\t{path}\t{secure}\t{expiration}\t{name}\t{value}\n")
-                        cookie_count += 1
+            name = get('name', '')
+            value = get('value', '')
+            domain = get('domain', '')
+            if not (name and value and domain):  # Only save valid cookies
+                continue
+            
+            # Handle both x.com and twitter.com domains. Every saved domain is
+            # dot-prefixed, so the include-subdomains flag is always TRUE.
+            if domain[:1] != '.':
+                domain = '.' + domain
+            
+            path = get('path') or '/'
+            secure = 'TRUE' if get('secure') else 'FALSE'
+            expiration = _expiration_str(get('expirationDate', get('expires', 0)))
+            
+            # Everything after the domain is shared by the x.com and twitter.com lines
+            fields = f"\tTRUE\t{path}\t{secure}\t{expiration}\t{name}\t{value}\n"
+            
+            if domain.endswith(_X_SUFFIX):  # .x.com and subdomains, but not .foox.com
+                # Also save for twitter.com domain for compatibility
+                lines_append(f"{domain}{fields}{domain[:-_X_HOST_LEN]}twitter.com{fields}")
+                cookie_count += 2
+            else:
+                lines_append(domain + fields)
+                cookie_count += 1
         
-        print(f"✅ Converted {len(cookies)} cookies to {output_path}")
-        print(f"📊 Total cookie entries saved: {cookie_count}")
+        _atomic_write(output_path, "".join(lines).encode('utf-8'))
+        
+        logger.info("✅ Converted %d cookies to %s", total, output_path)
+        logger.info("📊 Total cookie entries saved: %d", cookie_count)
         return True
         
-    except json.JSONDecodeError as e:
-        print(f"❌ JSON decode error: {e}")
+    except UnicodeEncodeError as e:  # a lone surrogate such as \udc80 in a name or value
+        logger.error("❌ Cookie contains text that can't be saved as UTF-8: %s", e)
         return False
     except Exception as e:
-        print(f"❌ Error converting cookies: {e}")
+        logger.error("❌ Error converting cookies: %s", e)
         return False
 
-class CookieFileHandler(FileSystemEventHandler):
+class CookieFileHandler(PatternMatchingEventHandler):
     """Handle file system events for cookie files"""
     
-    def __init__(self):
+    def __init__(self, debounce: float = DEBOUNCE_SECONDS, output_path: str = 'cookies.txt'):
+        # watchdog filters out directories and every other file before our callbacks run
+        super().__init__(patterns=['raw_cookies.json'], ignore_directories=True, case_sensitive=False)
         self.processed_files = set()
-        self.last_processed = {}
+        self.debounce = debounce
+        self.output_path = output_path
+        self._pending = {}  # file_path -> last event type seen
+        self._timer = None
+        self._lock = threading.Lock()
+        self._convert_lock = threading.Lock()
+        
+        # Fingerprints of the last successful conversion, used to skip no-op events
+        self.last_stat = None     # (path, st_mtime_ns, st_size) of the raw file
+        self.last_digest = None   # BLAKE2b of the raw file contents
+        self._last_output = None  # (st_mtime_ns, st_size) of the cookies.txt we wrote
     
     def on_created(self, event):
-        if not event.is_directory:
-            self.handle_file_event(event.src_path, "created")
+        self.handle_file_event(event.src_path, "created")
     
     def on_modified(self, event):
-        if not event.is_directory:
-            self.handle_file_event(event.src_path, "modified")
+        self.handle_file_event(event.src_path, "modified")
     
     def handle_file_event(self, file_path, event_type):
-        """Handle cookie file events"""
-        filename = os.path.basename(file_path)
-        
-        # Only process raw_cookies.json files
-        if filename.lower() != 'raw_cookies.json':
-            return
-        
-        # Prevent duplicate processing
-        current_time = time.time()
-        if file_path in self.last_processed:
-            if current_time - self.last_processed[file_path] < 2:  # 2-second cooldown
+        """Queue a cookie file event and (re)arm the debounce timer"""
+        # Missing or truncated (editors often truncate before writing): the
+        # event that follows the actual write will re-arm the timer
+        try:
+            if os.stat(file_path).st_size == 0:
                 return
+        except FileNotFoundError:
+            return
         
-        self.last_processed[file_path] = current_time
+        # Editors often emit several events per save; every new event pushes the
+        # conversion back so it only runs once the file has gone quiet
+        with self._lock:
+            self._pending[file_path] = event_type
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self._flush_pending)
+            self._timer.daemon = True
+            self._timer.start()
+    
+    def _flush_pending(self):
+        """Timer callback: convert every file that changed during the quiet period"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._timer = None
         
-        # Wait a moment for file write to complete
-        time.sleep(0.5)
+        # Runs on the timer thread, so the observer keeps dispatching meanwhile
+        with self._convert_lock:
+            for file_path, event_type in pending.items():
+                self.process_file(file_path, event_type)
+    
+    def _output_signature(self):
+        try:
+            st = os.stat(self.output_path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+    
+    def _already_converted(self):
+        """True if cookies.txt is still exactly what the last conversion wrote"""
+        return self._last_output is not None and self._output_signature() == self._last_output
+    
+    def process_file(self, file_path, event_type) -> bool:
+        """Convert a settled raw_cookies.json to cookies.txt"""
+        filename = os.path.basename(file_path)
         
-        if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
-            print(f"\n🔍 Cookie file {event_type}: {filename}")
-            
-            success = convert_raw_cookies_to_netscape(file_path)
-            if success:
-                print("✅ Cookies are now ready for use!")
-                print("🎯 API will automatically use new cookies for requests")
+        # One open + fstat + read: no separate exists/getsize probes, and the
+        # bytes we convert are the bytes we fingerprinted
+        try:
+            with open(file_path, 'rb') as fh:
+                st = os.fstat(fh.fileno())
+                if st.st_size == 0:
+                    return False
                 
-                # Optionally remove the raw file after successful conversion
-                try:
-                    os.remove(file_path)
-                    print(f"🗑️  Cleaned up {filename}")
-                except:
-                    pass
-            else:
-                print("❌ Cookie conversion failed - please check file format")
-
-def start_cookie_watcher(watch_directory: str = '.'):
-    """Start watching for cookie files in the specified directory"""
-    print(f"🔍 Starting cookie file watcher in: {os.path.abspath(watch_directory)}")
-    print("📁 Watching for: raw_cookies.json")
-    print("🔄 Auto-convert to: cookies.txt")
-    
-    # Check for existing raw_cookies.json on startup
-    raw_cookies_path = os.path.join(watch_directory, 'raw_cookies.json')
-    if os.path.exists(raw_cookies_path):
-        print(f"\n🔍 Found existing {raw_cookies_path}")
-        success = convert_raw_cookies_to_netscape(raw_cookies_path)
+                # Same file, untouched since last time: nothing to do
+                stat_key = (file_path, st.st_mtime_ns, st.st_size)
+                if stat_key == self.last_stat and self._already_converted():
+                    return True
+                
+                data = fh.read()
+        except OSError:
+            return False
+        
+        logger.info("🔍 Cookie file %s: %s", event_type, filename)
+        
+        # Identical contents (e.g. an editor re-saving): skip the parse and rewrite
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        if digest == self.last_digest and self._already_converted():
+            logger.info("⏭️  Cookie contents unchanged - cookies.txt is already up to date")
+            success = True
+        else:
+            success = convert_raw_cookies_bytes(data, self.output_path)
+        
         if success:
-            print("✅ Existing cookies converted successfully!")
+            self.last_stat = stat_key
+            self.last_digest = digest
+            self._last_output = self._output_signature()
+            logger.info("✅ Cookies are now ready for use!")
+            logger.info("🎯 API will automatically use new cookies for requests")
+            
+            # Optionally remove the raw file after successful conversion
             try:
-                os.remove(raw_cookies_path)
-                print("🗑️  Cleaned up raw_cookies.json")
+                os.remove(file_path)
+                logger.info("🗑️  Cleaned up %s", filename)
             except:
                 pass
-    
-    # Setup file watcher
-    event_handler = CookieFileHandler()
+        else:
+            logger.error("❌ Cookie conversion failed - please check file format")
+        return success
+
+def _start_observer(event_handler, watch_directory: str):
+    """Start the platform-native observer, falling back to slow polling if it fails"""
     observer = Observer()
+    try:
+        observer.schedule(event_handler, watch_directory, recursive=False)
+        observer.start()
+        return observer
+    except OSError as e:
+        logger.warning("⚠️  Native file watching unavailable (%s); polling every %ss instead", e, POLL_INTERVAL_SECONDS)
+        observer.stop()
+    
+    observer = PollingObserver(timeout=POLL_INTERVAL_SECONDS)
     observer.schedule(event_handler, watch_directory, recursive=False)
+    observer.start()
+    return observer
+
+def start_cookie_watcher(watch_directory: str = '.', stop_event: threading.Event = None):
+    """Start watching for cookie files in the specified directory until Ctrl+C or stop_event is set"""
+    logger.info("🔍 Starting cookie file watcher in: %s", os.path.abspath(watch_directory))
+    logger.info("📁 Watching for: raw_cookies.json")
+    logger.info("🔄 Auto-convert to: cookies.txt")
+    
+    event_handler = CookieFileHandler()
+    
+    # Check for existing raw_cookies.json on startup (a missing file is a no-op)
+    raw_cookies_path = os.path.join(watch_directory, 'raw_cookies.json')
+    event_handler.process_file(raw_cookies_path, "found on startup")
+    
+    # Ctrl+C only needs to stop the observer; join() below then returns. Signal
+    # handlers can only be installed from the main thread (not when embedded
+    # in ServiceManager's watcher thread).
+    observer = None
+    previous_handler = None
+    if threading.current_thread() is threading.main_thread():
+        def handle_sigint(signum, frame):
+            logger.info("🛑 Cookie watcher stopped")
+            if observer is not None:
+                observer.stop()
+        previous_handler = signal.signal(signal.SIGINT, handle_sigint)
     
     try:
-        observer.start()
-        print("✅ Cookie file watcher is active")
-        print("💡 Drop raw_cookies.json into this folder to auto-convert")
+        observer = _start_observer(event_handler, watch_directory)
+        logger.info("✅ Cookie file watcher is active")
+        logger.info("💡 Drop raw_cookies.json into this folder to auto-convert")
         
-        # Keep the watcher running
-        while True:
-            time.sleep(1)
-            
+        # Block until the observer thread is stopped instead of waking up every second
+        if stop_event is not None:
+            # Embedded: the owner sets stop_event so the watch is released cleanly
+            stop_event.wait()
+            logger.info("🛑 Cookie watcher stopped")
+            observer.stop()
+        observer.join()
+    
     except KeyboardInterrupt:
-        print("\n🛑 Cookie watcher stopped")
-        observer.stop()
+        logger.info("🛑 Cookie watcher stopped")
+        if observer is not None:
+            observer.stop()
+            observer.join()
     except Exception as e:
-        print(f"❌ Cookie watcher error: {e}")
-        observer.stop()
-    
-    observer.join()
+        logger.error("❌ Cookie watcher error: %s", e)
+        if observer is not None:
+            observer.stop()
+            if observer.is_alive():
+                observer.join()
+    finally:
+        if previous_handler is not None:
+            signal.signal(signal.SIGINT, previous_handler)
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     start_cookie_watcher() 
\ No newline at end of file
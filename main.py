@@ -1,19 +1,42 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, Request, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
-from pydantic import BaseModel, HttpUrl, Field
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response
+from fastapi.staticfiles import StaticFiles
+from pydantic import BaseModel, Field
+from cachetools import TTLCache
 import yt_dlp
+import orjson
 import os
-import json
+import asyncio
+import gzip
 import re
 import time
 import hashlib
+import sqlite3
+import heapq
+import logging
+import threading
 import uuid
-from typing import Optional, Dict, Any
+from types import MappingProxyType
+from typing import Optional, Dict, Any, List, NamedTuple, Tuple
+from functools import lru_cache
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
 import tempfile
 import unicodedata
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the cache sweeper for the lifetime of the server"""
+    sweeper = asyncio.create_task(sweep_caches())
+    yield
+    sweeper.cancel()
+
 app = FastAPI(
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     title="🏆 Twitter Video Downloader API - Smart Detection Edition",
     version="3.0.0",
     description="""
@@ -78,13 +101,142 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Cookie manager script and other static assets, resolved next to this file
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+app.mount('/static', StaticFiles(directory=STATIC_DIR), name='static')
+
 # Global variables
-video_cache: Dict[str, Dict[str, Any]] = {}
+CACHE_TTL = 3600           # seconds a successful extraction is reused
+CACHE_MAXSIZE = 1024       # entries kept before the least recently used is evicted
+URL_EXPIRY_MARGIN = 600    # re-extract when the cached download URL expires within this many seconds
+URL_LIFETIME = 6 * 3600    # Twitter video URLs typically expire about 6 hours after extraction
+FAILURE_TTL = 60           # seconds a permanent extraction failure is replayed instead of retried
+CACHE_SWEEP_INTERVAL = 60  # seconds between purges of expired cache entries
+
+# (refresh deadline in monotonic ns, serialized VideoResponse) per URL. Only
+# touched from the event loop thread, so no extra locking is needed
+video_cache: TTLCache = TTLCache(maxsize=CACHE_MAXSIZE, ttl=CACHE_TTL)
+# (cookies.txt mtime, exception) of recent failures that would fail the same way
+# again (deleted tweet, no video, login required), so client retry loops don't each
+# cost a yt-dlp round-trip. Only replayed while cookies.txt is unchanged, as new
+# cookies may fix them. Same threading rules as video_cache.
+failed_cache: TTLCache = TTLCache(maxsize=CACHE_MAXSIZE, ttl=FAILURE_TTL)
+
+async def sweep_caches():
+    """Purge expired entries periodically; TTLCache only drops them when it is next mutated"""
+    while True:
+        await asyncio.sleep(CACHE_SWEEP_INTERVAL)
+        # Runs on the event loop thread like every other cache access, so no lock
+        video_cache.expire()
+        failed_cache.expire()
+
+# Second tier behind video_cache, shared by every worker process and kept across
+# restarts. Rows carry a wall-clock deadline since monotonic time doesn't survive
+# a restart. It lives in a per-user cache directory rather than the shared temp
+# directory, where another user could plant or read the file. Set DISK_CACHE_PATH
+# to an empty string to turn it off.
+DISK_CACHE_PATH = os.environ.get('DISK_CACHE_PATH', os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+    'twitter-api', 'cache.sqlite3'))
 COOKIES_FILE = 'cookies.txt'
 
+# yt-dlp extraction is blocking network I/O, so it runs on worker threads to keep
+# the event loop free for other requests while a tweet is being extracted
+EXTRACTOR_WORKERS = 8
+BATCH_MAX_URLS = 20        # URLs accepted by one /video/fetch/batch call
+# Distinct loads allowed to run or wait for a worker before new ones get a 503, so
+# overload fails fast instead of piling up in the pool's unbounded queue. Leaves
+# room for a full batch on top of a busy pool.
+MAX_PENDING_LOADS = EXTRACTOR_WORKERS * 2 + BATCH_MAX_URLS
+EXTRACTOR_POOL = ThreadPoolExecutor(max_workers=EXTRACTOR_WORKERS, thread_name_prefix='yt-dlp')
+
+logger = logging.getLogger(__name__)
+
+class MP4Fmt(NamedTuple):
+    """A playable MP4 format; the first four fields are the quality rank"""
+    height: int
+    tbr: float   # Total bitrate
+    vbr: float   # Video bitrate
+    fps: float
+    filesize: int
+    url: str
+    note: str
+    raw: dict
+
+# Resolution -> total bitrate -> video bitrate -> fps
+_MP4_RANK = itemgetter(0, 1, 2, 3)
+
+def select_mp4_formats(formats: list, limit: int = 5) -> Tuple[List[MP4Fmt], int]:
+    """Return the best `limit` MP4 formats (highest quality first) and the MP4 total"""
+    mp4_formats = [
+        MP4Fmt(
+            fmt.get('height') or 0,
+            fmt.get('tbr') or 0,
+            fmt.get('vbr') or 0,
+            fmt.get('fps') or 0,
+            fmt.get('filesize') or 0,
+            fmt.get('url', ''),
+            fmt.get('format_note', ''),
+            fmt,
+        )
+        for fmt in formats
+        if fmt.get('ext') == 'mp4' and fmt.get('vcodec') != 'none'
+    ]
+    
+    if not mp4_formats:
+        logger.warning("❌ No MP4 formats found among %d formats", len(formats))
+        # If no MP4 formats, list what there is, but only build that text when debugging
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Available formats:\n%s",
+                '\n'.join(  # Show first 10
+                    f"  📺 {fmt.get('ext', 'unknown')}: {fmt.get('height', 'unknown')}p, {fmt.get('format_note', '')}"
+                    for fmt in formats[:10]
+                ),
+            )
+        raise ValueError("No MP4 video formats available")
+    
+    # Only the top formats are ever used, so select them instead of sorting everything
+    top_formats = heapq.nlargest(limit, mp4_formats, key=_MP4_RANK)
+    
+    # Per-format output is only worth the stdout writes when debugging
+    if logger.isEnabledFor(logging.DEBUG):
+        for fmt in mp4_formats:
+            logger.debug("  📹 MP4: %sp, %skbps, %s", fmt.height, fmt.tbr, fmt.note)
+        logger.debug("🏆 MP4 Quality Rankings:")
+        for i, fmt in enumerate(top_formats, 1):
+            logger.debug("  %d. %sp, %skbps, %s", i, fmt.height, fmt.tbr, fmt.note)
+    
+    return top_formats, len(mp4_formats)
+
+# Extractions currently running, keyed like video_cache. Only touched from the
+# event loop thread, so plain dict operations are already race-free.
+_inflight: Dict[str, asyncio.Future] = {}
+
+def load_video_body_shared(cache_key: str, url: str, have_cookies: bool) -> asyncio.Future:
+    """Run load_video_body on the pool, joining an identical load if one is in flight"""
+    fut = _inflight.get(cache_key)
+    if fut is None:
+        if len(_inflight) >= MAX_PENDING_LOADS:
+            logger.warning("🚦 %d extractions pending, rejecting new work", len(_inflight))
+            raise HTTPException(
+                status_code=503,
+                detail="Server is busy extracting other videos. Please retry shortly.",
+                headers={"Retry-After": "2"},
+            )
+        loop = asyncio.get_running_loop()
+        fut = loop.run_in_executor(EXTRACTOR_POOL, load_video_body, cache_key, url, have_cookies)
+        _inflight[cache_key] = fut
+        fut.add_done_callback(lambda _: _inflight.pop(cache_key, None))
+    # Shield so one client disconnecting doesn't cancel the result for everyone else
+    return asyncio.shield(fut)
+
 # Pydantic models
 class VideoRequest(BaseModel):
-    url: HttpUrl
+    url: str  # checked by is_valid_twitter_url, which is stricter than HttpUrl
+
+class BatchRequest(BaseModel):
+    urls: List[str] = Field(min_length=1, max_length=BATCH_MAX_URLS)
 
 class CookiesRequest(BaseModel):
     cookies: list
@@ -119,7 +271,7 @@ class VideoResponse(BaseModel):
     file_size: Optional[int] = Field(default=None, description="File size in bytes of best quality video")
     content_rating: str = "General Audience"
     is_adult: bool = Field(default=False, description="🔞 True if adult/NSFW content (required cookies), False if general audience")
-    expires_at: float = Field(description="URL expiration timestamp (6 hours from extraction)")
+    expires_at: int = Field(description="URL expiration timestamp in epoch seconds (6 hours from extraction)")
     available_qualities: Optional[list] = Field(
         default=[], 
         description="📊 ALL MP4 qualities available with URLs, bitrates, and file sizes"
@@ -155,7 +307,7 @@ class VideoResponse(BaseModel):
                 "file_size": 15728640,
                 "content_rating": "General Audience",
                 "is_adult": False,
-                "expires_at": 1704097200.0,
+                "expires_at": 1704097200,
                 "available_qualities": [
                     {
                         "quality": "1080p",
@@ -178,6 +330,8 @@ class VideoResponse(BaseModel):
 class ErrorResponse(BaseModel):
     error: str
 
+NETSCAPE_HEADER = "# Netscape HTTP Cookie File\n# Generated by Twitter Video Downloader\n\n"
+
 def save_cookies_from_json(cookies_json: list) -> bool:
     """Convert JSON cookies to Netscape format and save to file"""
     try:
@@ -193,425 +347,565 @@ def save_cookies_from_json(cookies_json: list) -> bool:
             name = cookie.get('name', '')
             value = cookie.get('value', '')
             
-            # Create Netscape format line
-            netscape_line = f"{domain}	{flag}	{path}	{secure}	{expiration}	{name}	{value}"
-            netscape_cookies.append(netscape_line)
+            # Create Netscape format line (newline included, so the lines just concatenate)
+            netscape_cookies.append(f"{domain}	{flag}	{path}	{secure}	{expiration}	{name}	{value}\n")
         
         # Write to cookies file
         with open(COOKIES_FILE, 'w', encoding='utf-8') as f:
-            f.write("# Netscape HTTP Cookie File\n")
-            f.write("# Generated by Twitter Video Downloader\n\n")
-            for line in netscape_cookies:
-                f.write(line + '\n')
+            f.write(NETSCAPE_HEADER)
+            f.write(''.join(netscape_cookies))
         
-        print(f"✅ Saved {len(cookies_json)} cookies to {COOKIES_FILE}")
+        set_cookies_available(True)
+        logger.info("✅ Saved %d cookies to %s", len(cookies_json), COOKIES_FILE)
         return True
         
     except Exception as e:
-        print(f"❌ Error saving cookies: {e}")
+        logger.error("❌ Error saving cookies: %s", e)
+        return False
+
+# cookies.txt can also be written by the cookie watcher in another process, so
+# it is re-checked at most every COOKIES_CHECK_TTL seconds and updated
+# immediately whenever this process changes the file
+COOKIES_CHECK_TTL = 5
+_cookies_state = {'mtime_ns': None, 'checked_at': float('-inf')}
+
+def _stat_cookies():
+    """Refresh _cookies_state from disk"""
+    try:
+        _cookies_state['mtime_ns'] = os.stat(COOKIES_FILE).st_mtime_ns
+    except OSError:
+        _cookies_state['mtime_ns'] = None
+    _cookies_state['checked_at'] = time.monotonic()
+
+def cookies_mtime() -> Optional[int]:
+    """Cached st_mtime_ns of COOKIES_FILE, or None when it doesn't exist"""
+    if time.monotonic() - _cookies_state['checked_at'] >= COOKIES_CHECK_TTL:
+        _stat_cookies()
+    return _cookies_state['mtime_ns']
+
+def cookies_available() -> bool:
+    """Cached os.path.exists(COOKIES_FILE)"""
+    return cookies_mtime() is not None
+
+def set_cookies_available(exists: bool):
+    """Record a cookies file change made by this process"""
+    if exists:
+        _stat_cookies()
+    else:
+        _cookies_state['mtime_ns'] = None
+        _cookies_state['checked_at'] = time.monotonic()
+
+# path -> (mtime_ns, size, count) of the last count, so status polls of an
+# unchanged file cost a single stat()
+_cookie_counts: Dict[str, Tuple[int, int, int]] = {}
+
+def count_active_cookies(path: str) -> int:
+    """Count the non-empty, non-comment lines of a cookies file, re-reading it only when it changes"""
+    st = os.stat(path)
+    cached = _cookie_counts.get(path)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    # Bytes, so there is no decode step (and no UnicodeDecodeError on odd values)
+    with open(path, 'rb') as f:
+        count = sum(1 for line in f.read().splitlines() if line.strip() and not line.startswith(b'#'))
+    _cookie_counts[path] = (st.st_mtime_ns, st.st_size, count)
+    return count
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header lists etag, by weak comparison (RFC 9110 13.1.2)"""
+    if not if_none_match:
         return False
+    opaque = etag.removeprefix('W/')
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*' or candidate.removeprefix('W/') == opaque:
+            return True
+    return False
+
+def cookies_not_modified(request: Request, response: Response) -> Optional[Response]:
+    """304 if the client's copy of a cookie status response is current, else tag response for revalidation"""
+    # The status endpoints only depend on cookies.txt, so its version is the ETag
+    try:
+        st = os.stat(COOKIES_FILE)
+        etag = f'W/"{st.st_mtime_ns}-{st.st_size}"'
+    except FileNotFoundError:
+        etag = 'W/"missing"'
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if etag_matches(request.headers.get('if-none-match', ''), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+# Compiled once at import instead of going through re's pattern cache per request
+# (re.ASCII keeps \d to 0-9 instead of every Unicode digit)
+# Hosts yt-dlp's Twitter extractor accepts, checked with one set lookup
+_TWITTER_HOSTS = frozenset(
+    f'{prefix}{domain}' for prefix in ('', 'www.', 'm.', 'mobile.') for domain in ('twitter.com', 'x.com')
+)
+# Characters not allowed in filenames, replaced in one str.translate pass
+_FNAME_TABLE = str.maketrans(dict.fromkeys('<>:"/\\|?*', '_'))
+
+def compile_error_map(entries: list) -> tuple:
+    """Combine (pattern, message) pairs into one alternation so a single scan classifies an error"""
+    pattern = re.compile('|'.join(f'(?P<e{i}>{regex})' for i, (regex, _) in enumerate(entries)))
+    return pattern, {f'e{i}': message for i, (_, message) in enumerate(entries)}
+
+def classify_error(error_msg: str, error_map: tuple) -> str:
+    """Friendly message for the earliest known error in error_msg, else error_msg itself"""
+    pattern, messages = error_map
+    match = pattern.search(error_msg)
+    return messages[match.lastgroup] if match else error_msg
+
+# yt-dlp error text -> message returned by /video/fetch
+FETCH_ERRORS = compile_error_map([
+    (r'HTTP Error 404|Not Found', "Tweet not found. The tweet may have been deleted, the account is private, or the tweet doesn't contain a video."),
+    (r'HTTP Error 403|Forbidden', "Access forbidden. Cannot access private accounts or restricted content. Try uploading cookies."),
+    (r'HTTP Error 429|Too Many Requests', "Rate limit exceeded. Please wait a few minutes before trying again."),
+    (r'HTTP Error 401|Unauthorized', "Unauthorized access. Upload cookies to access private/restricted content."),
+    (r'Unsupported URL', "This Twitter/X URL is not supported. Please make sure the tweet contains a video."),
+    (r'Video unavailable', "Video is unavailable. It might be private, deleted, or from a protected account."),
+    (r'Unable to extract|Could not extract', "Unable to extract video. The tweet might not contain a video or might be restricted."),
+    (r'(?i:network|connection)', "Network connection error. Please check your internet connection and try again."),
+])
 
+# yt-dlp error text -> message returned by /test
+TEST_ERRORS = compile_error_map([
+    (r'HTTP Error 404|Not Found', "Tweet not found or deleted"),
+    (r'HTTP Error 403|Forbidden', "Access forbidden - need authentication cookies"),
+    (r'HTTP Error 401|Unauthorized', "Unauthorized - upload cookies for private content"),
+    (r'Unable to extract|Could not extract', "Could not extract video from this URL"),
+])
+
+# URLs are pasted repeatedly, and both helpers are pure, so memoize them (bounded)
+@lru_cache(maxsize=1024)
 def normalize_twitter_url(url: str) -> str:
-    """Normalize Twitter/X URL to standard format"""
+    """Canonical https://x.com/<path> form, so share links of one tweet share a cache entry"""
     url = url.strip()
-    url = re.sub(r'twitter\.com', 'x.com', url)
-    return url
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url  # unparsable; is_valid_twitter_url rejects it too
+    if parts.scheme not in ('http', 'https') or parts.hostname not in _TWITTER_HOSTS:
+        return url  # not ours; left for is_valid_twitter_url to reject
+    # Drop ?s=20-style share params, fragments and trailing slashes
+    return f"https://x.com{parts.path.rstrip('/')}"
 
+@lru_cache(maxsize=1024)
 def is_valid_twitter_url(url: str) -> bool:
-    """Check if URL is a valid Twitter/X URL"""
-    pattern = r'https?://(twitter\.com|x\.com)/.+/status/\d+'
-    return bool(re.match(pattern, url))
+    """Check for an http(s) Twitter/X URL whose path has /status/<numeric id> after a user"""
+    try:
+        parts = urlsplit(url)
+    except ValueError:  # e.g. "Invalid IPv6 URL" for an unbalanced '['
+        return False
+    if parts.scheme not in ('http', 'https') or parts.hostname not in _TWITTER_HOSTS:
+        return False
+    segments = parts.path.split('/')
+    try:
+        # segments[0] is the empty string before the leading slash, [1] the user
+        i = segments.index('status', 2)
+    except ValueError:
+        return False
+    tweet_id = segments[i + 1] if i + 1 < len(segments) else ''
+    return tweet_id.isascii() and tweet_id.isdigit()
 
 def get_cache_key(url: str) -> str:
-    """Generate cache key from URL"""
-    return hashlib.md5(url.encode()).hexdigest()
+    """Generate cache key from a normalized URL (twitter.com and x.com share entries)"""
+    # The canonical URL is short and already identifies the tweet, so it is used as
+    # is; str caches its own hash, so hashing it again would only add a call
+    return normalize_twitter_url(url)
 
-def is_cache_valid(cache_entry: dict, max_age: int = 3600) -> bool:
-    """Check if cache entry is still valid (default 1 hour)"""
-    return time.time() - cache_entry['timestamp'] < max_age
+def _format_duration(seconds) -> str:
+    """Render seconds as M:SS or H:MM:SS"""
+    if not seconds:
+        return "Unknown"
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
 
-def extract_video_info(url: str) -> dict:
-    """Extract video information using yt-dlp with smart adult content detection"""
+def _format_upload_date(date_str) -> str:
+    """Render yt-dlp's YYYYMMDD upload date as YYYY-MM-DD"""
+    if date_str and len(date_str) == 8 and date_str.isdigit():
+        return f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}"
+    return "Unknown"
+
+def _clean_filename(filename) -> str:
+    """Build a filesystem-safe ASCII .mp4 filename from a video title"""
+    if filename and not filename.isascii():
+        # Decompose accents and drop what has no ASCII form
+        filename = unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii')
+    if not filename:
+        # Titles with no ASCII characters at all (e.g. non-Latin scripts) end up empty
+        return f"twitter_video_{int(time.time())}.mp4"
+    # Replace invalid characters
+    return filename.translate(_FNAME_TABLE)[:100] + ".mp4"  # Limit length
+
+def _safe_int(value, default=0) -> int:
+    """int() that falls back to default for None and unparseable values"""
+    try:
+        return int(value) if value is not None else default
+    except (ValueError, TypeError):
+        return default
+
+# Enhanced yt-dlp options for best quality (read-only template; see get_ydl)
+BASE_YDL_OPTS = MappingProxyType({
+    'format': 'best[ext=mp4][vcodec!=none]/best[ext=mp4]/bestvideo[ext=mp4]+bestaudio[ext=m4a]/best',
+    'noplaylist': True,
+    'extract_flat': False,
+    'listformats': False,  # We'll handle format selection manually
+    # Only format URLs and basic metadata are returned, so skip everything else
+    'skip_download': True,
+    'writesubtitles': False,
+    'writeautomaticsub': False,
+    'writethumbnail': False,
+    'writeinfojson': False,
+    'check_formats': False,
+    'lazy_playlist': True,
+    'ignore_no_formats_error': False,
+    # graphql rather than syndication: only graphql raises "NSFW tweet requires
+    # authentication", which is what triggers the cookie retry
+    'extractor_args': {'twitter': {'api': ['graphql']}},
+    # Fail fast instead of hanging a worker thread on a slow connection
+    'socket_timeout': 8,
+    'retries': 1,
+    'fragment_retries': 1,
+    'cachedir': os.path.join(tempfile.gettempdir(), 'ytdlp-cache'),
+    'quiet': True,
+    'no_warnings': True,
+})
+COOKIE_YDL_OPTS = MappingProxyType({**BASE_YDL_OPTS, 'cookiefile': COOKIES_FILE})
+
+# One YoutubeDL per worker thread and cookie mode, so repeated extractions reuse
+# its HTTP connections instead of re-doing the TLS handshake every request
+_ydl_local = threading.local()
+
+def get_ydl(use_cookies: bool) -> Optional[yt_dlp.YoutubeDL]:
+    """Return this thread's YoutubeDL for the cookie mode, rebuilt when cookies.txt changes;
+    None for cookies when cookies.txt is gone"""
+    instances = getattr(_ydl_local, 'instances', None)
+    if instances is None:
+        instances = _ydl_local.instances = {}
+    # Cookies are loaded when YoutubeDL is created, so a newer file needs a new instance
+    stamp = None
+    if use_cookies:
+        try:
+            stamp = os.stat(COOKIES_FILE).st_mtime_ns
+        except FileNotFoundError:
+            # Deleted since the event loop last looked; _cookies_state catches up
+            # on its own next check, as it is only updated from the loop
+            return None
+    entry = instances.get(use_cookies)
+    if entry is None or entry[0] != stamp:
+        # yt-dlp fills in defaults on its params, so it gets its own copy of the template
+        opts = dict(COOKIE_YDL_OPTS if use_cookies else BASE_YDL_OPTS)
+        # The old instance is dropped rather than closed: closing would save its
+        # outdated cookie jar over the new cookies.txt
+        entry = instances[use_cookies] = (stamp, yt_dlp.YoutubeDL(opts))
+    return entry[1]
+
+def extract_metadata(info: dict) -> tuple:
+    """Return info's metadata fields in unpacking order, defaulting missing keys"""
+    # Plain lookups rather than merging into a defaults dict, which copied all of info
+    get = info.get
+    return (
+        get('title', 'Unknown Video'),
+        get('description', ''),
+        get('uploader') if 'uploader' in info else get('channel', 'Unknown'),
+        get('duration', 0),
+        get('upload_date', ''),
+        get('view_count', 0),
+        get('like_count', 0),
+        get('repost_count', 0),
+        get('thumbnail', ''),
+    )
+
+def _process_info(info: dict, used_cookies: bool) -> dict:
+    """Build the VideoResponse fields from a yt-dlp info dict"""
+    if not info:
+        raise ValueError("No video information could be extracted")
+    
+    # Get video format information
+    formats = info.get('formats', [])
+    if not formats:
+        raise ValueError("No video formats found")
+    
+    # Print all available formats for debugging
+    logger.debug("📊 Found %d total formats", len(formats))
+    
+    # Filter, rank and keep the top MP4 formats in one pass
+    top_formats, mp4_count = select_mp4_formats(formats)
+    best_format = top_formats[0].raw
+    logger.info("✅ Selected BEST MP4: %sp, %skbps%s", top_formats[0].height, top_formats[0].tbr,
+                " (using cookies)" if used_cookies else "")
+    
+    # Create quality summary for response
+    all_mp4_qualities = [
+        {
+            'quality': f"{fmt.height}p" if fmt.height else 'Unknown',
+            'bitrate': f"{fmt.tbr}kbps" if fmt.tbr else 'Unknown',
+            'filesize': fmt.filesize or 'Unknown',
+            'url': fmt.url
+        }
+        for fmt in top_formats  # Top 5 qualities
+    ]
+    
+    # Extract metadata with safe defaults
+    (title, description, uploader, duration, upload_date,
+     view_count, like_count, repost_count, thumbnail) = extract_metadata(info)
+    
+    duration_formatted = _format_duration(duration)
+    upload_date_formatted = _format_upload_date(upload_date)
+    
+    # Get download URL and file info
+    download_url = best_format.get('url', '')
+    if not download_url:
+        raise ValueError("Could not extract download URL")
+    
+    # Generate filename
+    safe_title = _clean_filename(title)
+    filename = f"{safe_title}"
+    
+    # Get quality info
+    quality = best_format.get('format_note', 'Unknown')
+    if not quality or quality == 'Unknown':
+        height = best_format.get('height')
+        if height:
+            quality = f"{height}p"
+        else:
+            quality = "Unknown"
+    
+    # Get file size
+    file_size = best_format.get('filesize') or best_format.get('filesize_approx')
+    
+    # Calculate expiration time (URLs typically expire in 6 hours)
+    expires_at = int(time.time()) + URL_LIFETIME
     
-    # Enhanced yt-dlp options for best quality
-    base_ydl_opts = {
-        'format': 'best[ext=mp4][vcodec!=none]/best[ext=mp4]/bestvideo[ext=mp4]+bestaudio[ext=m4a]/best',
-        'noplaylist': True,
-        'extract_flat': False,
-        'listformats': False,  # We'll handle format selection manually
+    return {
+        "success": True,
+        "title": title or 'Unknown Video',
+        "description": description or "",
+        "thumbnail": thumbnail or "",
+        "duration": _safe_int(duration),
+        "duration_formatted": duration_formatted,
+        "uploader": uploader or "",
+        "upload_date": upload_date or "",
+        "upload_date_formatted": upload_date_formatted,
+        "view_count": _safe_int(view_count),
+        "like_count": _safe_int(like_count),
+        "repost_count": _safe_int(repost_count),
+        "download_url": download_url,
+        "filename": filename,
+        "format": best_format.get('ext', 'mp4'),
+        "quality": quality,
+        "file_size": _safe_int(file_size, None),
+        "content_rating": 'Adult (18+)' if used_cookies else 'General Audience',
+        "is_adult": used_cookies,
+        "expires_at": expires_at,
+        "available_qualities": all_mp4_qualities,  # All MP4 qualities available
+        "total_formats_found": len(formats),
+        "mp4_formats_found": mp4_count
     }
+
+# Error text suggesting the tweet needs an authenticated (cookie) session; one
+# case-insensitive scan since yt-dlp's wording and casing vary between errors
+_AUTH_NEEDED_RE = re.compile(r'403|401|Forbidden|Unauthorized|private|protected|NSFW|authentication', re.IGNORECASE)
+
+def _needs_auth(error: Exception) -> bool:
+    """Whether a failed no-cookie extraction is worth retrying with cookies"""
+    # yt-dlp wraps the extractor's error; when it kept the HTTP response, its status
+    # is authoritative. Login-required errors have no cause, so fall back to the text.
+    if isinstance(error, yt_dlp.utils.DownloadError) and error.exc_info:
+        status = getattr(getattr(error.exc_info[1], 'cause', None), 'status', None)
+        if status is not None:
+            return status in (401, 403)
+    return bool(_AUTH_NEEDED_RE.search(str(error)))
+
+def _is_permanent_failure(error: Exception) -> bool:
+    """Whether retrying the same URL right away would fail the same way"""
+    if isinstance(error, ValueError):  # tweet has no (MP4) video
+        return True
+    if isinstance(error, yt_dlp.utils.DownloadError) and error.exc_info:
+        original = error.exc_info[1]
+        status = getattr(getattr(original, 'cause', None), 'status', None)
+        if status is not None:
+            # Client errors repeat; rate limits, 5xx and timeouts may clear up
+            return 400 <= status < 500 and status != 429
+        return getattr(original, 'expected', False)
+    return False
+
+# have_cookies is the event loop's cookies_available() snapshot, so extractor
+# threads never touch _cookies_state or failed_cache themselves
+def extract_video_info(url: str, have_cookies: bool) -> dict:
+    """Extract video information using yt-dlp with smart adult content detection"""
     
     # First attempt: Try without cookies (for general audience content)
-    print("🔍 Attempting to access content without cookies...")
-    ydl_opts = base_ydl_opts.copy()
-    used_cookies = False
+    logger.debug("🔍 Attempting to access content without cookies...")
     
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            # Extract video information
-            info = ydl.extract_info(url, download=False)
-            
-            if not info:
-                raise ValueError("No video information could be extracted")
-            
-            # Get video format information
-            formats = info.get('formats', [])
-            if not formats:
-                raise ValueError("No video formats found")
-            
-            # Print all available formats for debugging
-            print(f"\n📊 Found {len(formats)} total formats:")
-            
-            # Filter and analyze MP4 formats
-            mp4_formats = []
-            for fmt in formats:
-                if fmt.get('ext') == 'mp4' and fmt.get('vcodec') != 'none':
-                    quality_info = {
-                        'format_id': fmt.get('format_id', 'unknown'),
-                        'height': fmt.get('height', 0),
-                        'width': fmt.get('width', 0),
-                        'tbr': fmt.get('tbr', 0),  # Total bitrate
-                        'vbr': fmt.get('vbr', 0),  # Video bitrate
-                        'fps': fmt.get('fps', 0),
-                        'filesize': fmt.get('filesize', 0),
-                        'url': fmt.get('url', ''),
-                        'format_note': fmt.get('format_note', ''),
-                        'format': fmt
-                    }
-                    mp4_formats.append(quality_info)
-                    print(f"  📹 MP4: {quality_info['height']}p, {quality_info['tbr']}kbps, {quality_info['format_note']}")
-            
-            if not mp4_formats:
-                # If no MP4 formats, check all formats
-                print("❌ No MP4 formats found! Available formats:")
-                for fmt in formats[:10]:  # Show first 10
-                    print(f"  📺 {fmt.get('ext', 'unknown')}: {fmt.get('height', 'unknown')}p, {fmt.get('format_note', '')}")
-                raise ValueError("No MP4 video formats available")
-            
-            # Sort MP4 formats by quality (height first, then bitrate)
-            mp4_formats.sort(key=lambda x: (
-                x['height'] or 0,      # Primary: Height
-                x['tbr'] or 0,         # Secondary: Total bitrate  
-                x['vbr'] or 0,         # Tertiary: Video bitrate
-                x['fps'] or 0          # Quaternary: FPS
-            ), reverse=True)
-            
-            # Show sorted quality analysis
-            print(f"\n🏆 MP4 Quality Rankings:")
-            for i, fmt in enumerate(mp4_formats[:5], 1):
-                print(f"  {i}. {fmt['height']}p, {fmt['tbr']}kbps, {fmt['format_note']}")
-            
-            # Select the best MP4 format
-            best_format = mp4_formats[0]['format']
-            print(f"\n✅ Selected BEST MP4: {mp4_formats[0]['height']}p, {mp4_formats[0]['tbr']}kbps")
-            
-            # Create quality summary for response
-            all_mp4_qualities = [
-                {
-                    'quality': f"{fmt['height']}p" if fmt['height'] else 'Unknown',
-                    'bitrate': f"{fmt['tbr']}kbps" if fmt['tbr'] else 'Unknown',
-                    'filesize': fmt['filesize'] or 'Unknown',
-                    'url': fmt['url']
-                }
-                for fmt in mp4_formats[:5]  # Top 5 qualities
-            ]
-            
-            # Extract metadata with safe defaults
-            title = info.get('title', 'Unknown Video')
-            description = info.get('description', '')
-            uploader = info.get('uploader', info.get('channel', 'Unknown'))
-            duration = info.get('duration', 0)
-            upload_date = info.get('upload_date', '')
-            view_count = info.get('view_count', 0)
-            like_count = info.get('like_count', 0)
-            repost_count = info.get('repost_count', 0)
-            thumbnail = info.get('thumbnail', '')
-            
-            # Format duration
-            def format_duration(seconds):
-                if not seconds:
-                    return "Unknown"
-                minutes, seconds = divmod(int(seconds), 60)
-                hours, minutes = divmod(minutes, 60)
-                if hours:
-                    return f"{hours}:{minutes:02d}:{seconds:02d}"
-                return f"{minutes}:{seconds:02d}"
-            
-            duration_formatted = format_duration(duration)
-            
-            # Format upload date
-            def format_upload_date(date_str):
-                if not date_str or len(date_str) != 8:
-                    return "Unknown"
-                try:
-                    year, month, day = date_str[:4], date_str[4:6], date_str[6:8]
-                    return f"{year}-{month}-{day}"
-                except:
-                    return "Unknown"
-            
-            upload_date_formatted = format_upload_date(upload_date)
-            
-            # Clean filename
-            def clean_filename(filename):
-                if not filename:
-                    return f"twitter_video_{int(time.time())}.mp4"
-                # Remove invalid characters
-                filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
-                filename = unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii')
-                return filename[:100] + ".mp4"  # Limit length
-            
-            # Get download URL and file info
-            download_url = best_format.get('url', '')
-            if not download_url:
-                raise ValueError("Could not extract download URL")
-            
-            # Generate filename
-            safe_title = clean_filename(title)
-            filename = f"{safe_title}"
-            
-            # Get quality info
-            quality = best_format.get('format_note', 'Unknown')
-            if not quality or quality == 'Unknown':
-                height = best_format.get('height')
-                if height:
-                    quality = f"{height}p"
-                else:
-                    quality = "Unknown"
-            
-            # Get file size
-            file_size = best_format.get('filesize') or best_format.get('filesize_approx')
-            
-            # Helper function for safe integer conversion
-            def safe_int(value, default=0):
-                try:
-                    return int(value) if value is not None else default
-                except (ValueError, TypeError):
-                    return default
-            
-            # Calculate expiration time (URLs typically expire in 6 hours)
-            expires_at = time.time() + (6 * 3600)
-            
-            return {
-                "success": True,
-                "title": title,
-                "description": description or "",
-                "thumbnail": thumbnail,
-                "duration": safe_int(duration),
-                "duration_formatted": duration_formatted,
-                "uploader": uploader,
-                "upload_date": upload_date,
-                "upload_date_formatted": upload_date_formatted,
-                "view_count": safe_int(view_count),
-                "like_count": safe_int(like_count),
-                "repost_count": safe_int(repost_count),
-                "download_url": download_url,
-                "filename": filename,
-                "format": best_format.get('ext', 'mp4'),
-                "quality": quality,
-                "file_size": file_size,
-                "content_rating": 'Adult (18+)' if used_cookies else 'General Audience',
-                "is_adult": used_cookies,
-                "expires_at": expires_at,
-                "available_qualities": all_mp4_qualities,  # All MP4 qualities available
-                "total_formats_found": len(formats),
-                "mp4_formats_found": len(mp4_formats)
-            }
-            
+        info = get_ydl(use_cookies=False).extract_info(url, download=False)
+        return _process_info(info, used_cookies=False)
+        
     except Exception as e:
         error_msg = str(e)
-        print(f"❌ First attempt failed: {error_msg}")
+        logger.warning("❌ First attempt failed: %s", error_msg)
         
         # Check if error suggests authentication is needed
-        if any(keyword in error_msg for keyword in ["403", "401", "Forbidden", "Unauthorized", "private", "protected", "NSFW", "authentication", "requires authentication"]):
-            if os.path.exists(COOKIES_FILE):
-                print("🔄 Retrying with cookies for adult/private content...")
+        if _needs_auth(e):
+            cookie_ydl = get_ydl(use_cookies=True) if have_cookies else None
+            if cookie_ydl is not None:
+                logger.info("🔄 Retrying with cookies for adult/private content...")
                 try:
                     # Second attempt: Try with cookies
-                    ydl_opts_with_cookies = base_ydl_opts.copy()
-                    ydl_opts_with_cookies['cookiefile'] = COOKIES_FILE
-                    used_cookies = True
+                    info = cookie_ydl.extract_info(url, download=False)
+                    return _process_info(info, used_cookies=True)
                     
-                    with yt_dlp.YoutubeDL(ydl_opts_with_cookies) as ydl:
-                        # Extract video information
-                        info = ydl.extract_info(url, download=False)
-                        
-                        if not info:
-                            raise ValueError("No video information could be extracted")
-                        
-                        # Get video format information
-                        formats = info.get('formats', [])
-                        if not formats:
-                            raise ValueError("No video formats found")
-                        
-                        # Print all available formats for debugging
-                        print(f"\n📊 Found {len(formats)} total formats:")
-                        
-                        # Filter and analyze MP4 formats
-                        mp4_formats = []
-                        for fmt in formats:
-                            if fmt.get('ext') == 'mp4' and fmt.get('vcodec') != 'none':
-                                quality_info = {
-                                    'format_id': fmt.get('format_id', 'unknown'),
-                                    'height': fmt.get('height', 0),
-                                    'width': fmt.get('width', 0),
-                                    'tbr': fmt.get('tbr', 0),  # Total bitrate
-                                    'vbr': fmt.get('vbr', 0),  # Video bitrate
-                                    'fps': fmt.get('fps', 0),
-                                    'filesize': fmt.get('filesize', 0),
-                                    'url': fmt.get('url', ''),
-                                    'format_note': fmt.get('format_note', ''),
-                                    'format': fmt
-                                }
-                                mp4_formats.append(quality_info)
-                                print(f"  📹 MP4: {quality_info['height']}p, {quality_info['tbr']}kbps, {quality_info['format_note']}")
-                        
-                        if not mp4_formats:
-                            # If no MP4 formats, check all formats
-                            print("❌ No MP4 formats found! Available formats:")
-                            for fmt in formats[:10]:  # Show first 10
-                                print(f"  📺 {fmt.get('ext', 'unknown')}: {fmt.get('height', 'unknown')}p, {fmt.get('format_note', '')}")
-                            raise ValueError("No MP4 video formats available")
-                        
-                        # Sort MP4 formats by quality (height first, then bitrate)
-                        mp4_formats.sort(key=lambda x: (
-                            x['height'] or 0,      # Primary: Height
-                            x['tbr'] or 0,         # Secondary: Total bitrate  
-                            x['vbr'] or 0,         # Tertiary: Video bitrate
-                            x['fps'] or 0          # Quaternary: FPS
-                        ), reverse=True)
-                        
-                        # Show sorted quality analysis
-                        print(f"\n🏆 MP4 Quality Rankings:")
-                        for i, fmt in enumerate(mp4_formats[:5], 1):
-                            print(f"  {i}. {fmt['height']}p, {fmt['tbr']}kbps, {fmt['format_note']}")
-                        
-                        # Select the best MP4 format
-                        best_format = mp4_formats[0]['format']
-                        print(f"\n✅ Selected BEST MP4: {mp4_formats[0]['height']}p, {mp4_formats[0]['tbr']}kbps (using cookies)")
-                        
-                        # Create quality summary for response
-                        all_mp4_qualities = [
-                            {
-                                'quality': f"{fmt['height']}p" if fmt['height'] else 'Unknown',
-                                'bitrate': f"{fmt['tbr']}kbps" if fmt['tbr'] else 'Unknown',
-                                'filesize': fmt['filesize'] or 'Unknown',
-                                'url': fmt['url']
-                            }
-                            for fmt in mp4_formats[:5]  # Top 5 qualities
-                        ]
-                        
-                        # Extract metadata with safe defaults
-                        title = info.get('title', 'Unknown Video')
-                        description = info.get('description', '')
-                        uploader = info.get('uploader', info.get('channel', 'Unknown'))
-                        duration = info.get('duration', 0)
-                        upload_date = info.get('upload_date', '')
-                        view_count = info.get('view_count', 0)
-                        like_count = info.get('like_count', 0)
-                        repost_count = info.get('repost_count', 0)
-                        thumbnail = info.get('thumbnail', '')
-                        
-                        # Format duration
-                        def format_duration(seconds):
-                            if not seconds:
-                                return "Unknown"
-                            minutes, seconds = divmod(int(seconds), 60)
-                            hours, minutes = divmod(minutes, 60)
-                            if hours:
-                                return f"{hours}:{minutes:02d}:{seconds:02d}"
-                            return f"{minutes}:{seconds:02d}"
-                        
-                        duration_formatted = format_duration(duration)
-                        
-                        # Format upload date
-                        def format_upload_date(date_str):
-                            if not date_str or len(date_str) != 8:
-                                return "Unknown"
-                            try:
-                                year, month, day = date_str[:4], date_str[4:6], date_str[6:8]
-                                return f"{year}-{month}-{day}"
-                            except:
-                                return "Unknown"
-                        
-                        upload_date_formatted = format_upload_date(upload_date)
-                        
-                        # Clean filename
-                        def clean_filename(filename):
-                            if not filename:
-                                return f"twitter_video_{int(time.time())}.mp4"
-                            # Remove invalid characters
-                            filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
-                            filename = unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii')
-                            return filename[:100] + ".mp4"  # Limit length
-                        
-                        # Get download URL and file info
-                        download_url = best_format.get('url', '')
-                        if not download_url:
-                            raise ValueError("Could not extract download URL")
-                        
-                        # Generate filename
-                        safe_title = clean_filename(title)
-                        filename = f"{safe_title}"
-                        
-                        # Get quality info
-                        quality = best_format.get('format_note', 'Unknown')
-                        if not quality or quality == 'Unknown':
-                            height = best_format.get('height')
-                            if height:
-                                quality = f"{height}p"
-                            else:
-                                quality = "Unknown"
-                        
-                        # Get file size
-                        file_size = best_format.get('filesize') or best_format.get('filesize_approx')
-                        
-                        # Helper function for safe integer conversion
-                        def safe_int(value, default=0):
-                            try:
-                                return int(value) if value is not None else default
-                            except (ValueError, TypeError):
-                                return default
-                        
-                        # Calculate expiration time (URLs typically expire in 6 hours)
-                        expires_at = time.time() + (6 * 3600)
-                        
-                        return {
-                            "success": True,
-                            "title": title,
-                            "description": description or "",
-                            "thumbnail": thumbnail,
-                            "duration": safe_int(duration),
-                            "duration_formatted": duration_formatted,
-                            "uploader": uploader,
-                            "upload_date": upload_date,
-                            "upload_date_formatted": upload_date_formatted,
-                            "view_count": safe_int(view_count),
-                            "like_count": safe_int(like_count),
-                            "repost_count": safe_int(repost_count),
-                            "download_url": download_url,
-                            "filename": filename,
-                            "format": best_format.get('ext', 'mp4'),
-                            "quality": quality,
-                            "file_size": file_size,
-                                                         "content_rating": 'Adult (18+)' if used_cookies else 'General Audience',
-                             "is_adult": used_cookies,
-                             "expires_at": expires_at,
-                            "available_qualities": all_mp4_qualities,  # All MP4 qualities available
-                            "total_formats_found": len(formats),
-                            "mp4_formats_found": len(mp4_formats)
-                        }
-                        
                 except Exception as cookie_error:
-                    print(f"❌ Cookie attempt also failed: {cookie_error}")
+                    logger.error("❌ Cookie attempt also failed: %s", cookie_error)
                     raise
             else:
-                print("❌ No cookies available for private content")
+                logger.warning("❌ No cookies available for private content")
                 raise
         else:
-            print(f"❌ Non-authentication error: {error_msg}")
+            logger.error("❌ Non-authentication error: %s", error_msg)
             raise
 
-@app.post("/video/fetch", response_model=VideoResponse)
+# One SQLite connection per worker thread; sqlite3 connections can't be shared
+_disk_local = threading.local()
+
+_disk_cache_refused = False  # set once the cache file failed the ownership check
+
+def _open_disk_cache_file(path: str) -> None:
+    """Create path 0600 in a 0700 directory, refusing a file another user owns"""
+    os.makedirs(os.path.dirname(path) or '.', mode=0o700, exist_ok=True)
+    # O_NOFOLLOW so a symlink planted at path is refused instead of followed
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_NOFOLLOW', 0), 0o600)
+    try:
+        if hasattr(os, 'getuid') and os.fstat(fd).st_uid != os.getuid():
+            raise PermissionError(f"{path} is owned by another user")
+        if hasattr(os, 'fchmod'):
+            os.fchmod(fd, 0o600)  # tighten a file left over from an older, looser default
+    finally:
+        os.close(fd)
+
+def _disk_cache() -> Optional[sqlite3.Connection]:
+    """This thread's connection to the disk cache, or None when it is turned off"""
+    global _disk_cache_refused
+    if not DISK_CACHE_PATH or _disk_cache_refused:
+        return None
+    conn = getattr(_disk_local, 'conn', None)
+    if conn is None:
+        try:
+            _open_disk_cache_file(DISK_CACHE_PATH)
+        except OSError as e:
+            _disk_cache_refused = True
+            logger.warning("⚠️ Disk cache disabled: %s", e)
+            return None
+        conn = sqlite3.connect(DISK_CACHE_PATH, timeout=1, isolation_level=None)
+        # WAL lets other worker processes read while one of them writes
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS video_cache "
+            "(key TEXT PRIMARY KEY, deadline REAL NOT NULL, body BLOB NOT NULL)"
+        )
+        _disk_local.conn = conn
+    return conn
+
+def disk_cache_get(cache_key: str) -> Optional[Tuple[float, bytes]]:
+    """(wall-clock refresh deadline, body) for cache_key if the disk cache has a fresh copy"""
+    try:
+        conn = _disk_cache()
+        if conn is None:
+            return None
+        return conn.execute(
+            "SELECT deadline, body FROM video_cache WHERE key = ? AND deadline > ?",
+            (cache_key, time.time()),
+        ).fetchone()
+    except sqlite3.Error as e:
+        logger.warning("⚠️ Disk cache read failed: %s", e)
+        return None
+
+def disk_cache_set(cache_key: str, deadline: float, body: bytes) -> None:
+    """Store body until deadline, dropping rows that have already gone stale"""
+    try:
+        conn = _disk_cache()
+        if conn is None:
+            return
+        conn.execute("DELETE FROM video_cache WHERE deadline <= ?", (time.time(),))
+        conn.execute(
+            "INSERT OR REPLACE INTO video_cache (key, deadline, body) VALUES (?, ?, ?)",
+            (cache_key, deadline, body),
+        )
+    except sqlite3.Error as e:
+        logger.warning("⚠️ Disk cache write failed: %s", e)
+
+def disk_cache_clear() -> None:
+    """Empty the disk cache for every worker process"""
+    try:
+        conn = _disk_cache()
+        if conn is not None:
+            conn.execute("DELETE FROM video_cache")
+    except sqlite3.Error as e:
+        logger.warning("⚠️ Disk cache clear failed: %s", e)
+
+def load_video_body(cache_key: str, url: str, have_cookies: bool) -> Tuple[float, bytes]:
+    """(wall-clock refresh deadline, serialized VideoResponse) from the disk cache or yt-dlp"""
+    cached = disk_cache_get(cache_key)
+    if cached is not None:
+        logger.debug("Returning disk-cached video data")
+        return cached
+    
+    logger.info("Extracting video data for: %s", url)
+    video_data = extract_video_info(url, have_cookies)
+    
+    # _process_info already emits the VideoResponse shape, so encode it straight away.
+    # Refresh after CACHE_TTL, or earlier if the download URL is about to expire.
+    body = orjson.dumps(video_data)
+    deadline = min(video_data['expires_at'] - URL_EXPIRY_MARGIN, time.time() + CACHE_TTL)
+    disk_cache_set(cache_key, deadline, body)
+    
+    logger.info(
+        "Successfully extracted: %s\nContent Rating: %s\nDownload URL ready: %.100s...",
+        video_data['title'], video_data['content_rating'], video_data['download_url'],
+    )
+    
+    return deadline, body
+
+async def get_video_response_body(url: str) -> bytes:
+    """Serialized VideoResponse for url, from video_cache or a fresh extraction"""
+    # Check cache first (TTLCache drops stale entries; also skip entries whose
+    # download URL is about to expire)
+    cache_key = get_cache_key(url)
+    cached = video_cache.get(cache_key)
+    if cached is not None and time.monotonic_ns() < cached[0]:
+        logger.debug("Returning cached video data")
+        # Already validated and serialized when it was cached
+        return cached[1]
+    
+    # A failure recorded before cookies.txt last changed is retried instead
+    cookies_stamp = cookies_mtime()
+    failure = failed_cache.get(cache_key)
+    if failure is not None and failure[0] == cookies_stamp:
+        logger.debug("Returning cached extraction failure")
+        # Fresh traceback, so replaying doesn't keep growing the stored one
+        raise failure[1].with_traceback(None)
+    
+    # Load from the disk cache or extract (off the event loop); concurrent requests
+    # for the same tweet share one load
+    try:
+        deadline, body = await load_video_body_shared(cache_key, url, cookies_stamp is not None)
+    except Exception as e:
+        if _is_permanent_failure(e):
+            failed_cache[cache_key] = (cookies_stamp, e)
+        raise
+    
+    # Keep it in memory until the deadline, converted to the monotonic clock
+    remaining = deadline - time.time()
+    video_cache[cache_key] = (time.monotonic_ns() + int(remaining * 1e9), body)
+    
+    return body
+
+@app.post("/video/fetch", responses={200: {"model": VideoResponse}})
 async def fetch_video_data(request: VideoRequest):
     """
     🏆 **Extract BEST QUALITY Video from Twitter/X with Smart Adult Detection** 
@@ -656,7 +950,7 @@ async def fetch_video_data(request: VideoRequest):
     - `mp4_formats_found`: Number of MP4 options available
     """
     try:
-        url = str(request.url)
+        url = request.url
         normalized_url = normalize_twitter_url(url)
         
         if not is_valid_twitter_url(normalized_url):
@@ -665,54 +959,47 @@ async def fetch_video_data(request: VideoRequest):
                 detail="Please provide a valid Twitter/X URL (e.g., https://twitter.com/user/status/123...)"
             )
         
-        # Check cache first
-        cache_key = get_cache_key(url)
-        if cache_key in video_cache and is_cache_valid(video_cache[cache_key]):
-            print("Returning cached video data")
-            cached_data = video_cache[cache_key]['data']
-            return VideoResponse(**cached_data)
-        
-        print(f"Extracting video data for: {url}")
-        
-        # Extract video information and download URL
-        video_data = extract_video_info(url)
-        
-        # Cache the result
-        video_cache[cache_key] = {
-            'data': video_data,
-            'timestamp': time.time()
-        }
-        
-        print(f"Successfully extracted: {video_data['title']}")
-        print(f"Content Rating: {video_data['content_rating']}")
-        print(f"Download URL ready: {video_data['download_url'][:100]}...")
-        
-        return VideoResponse(**video_data)
+        body = await get_video_response_body(normalized_url)
+        return Response(content=body, media_type='application/json')
         
+    except HTTPException:
+        raise
     except Exception as e:
         error_msg = str(e)
-        print(f"Video extraction error: {error_msg}")
+        logger.error("Video extraction error: %s", error_msg)
         
         # Provide specific error messages
-        if "HTTP Error 404" in error_msg or "Not Found" in error_msg:
-            error_msg = "Tweet not found. The tweet may have been deleted, the account is private, or the tweet doesn't contain a video."
-        elif "HTTP Error 403" in error_msg or "Forbidden" in error_msg:
-            error_msg = "Access forbidden. Cannot access private accounts or restricted content. Try uploading cookies."
-        elif "HTTP Error 429" in error_msg or "Too Many Requests" in error_msg:
-            error_msg = "Rate limit exceeded. Please wait a few minutes before trying again."
-        elif "HTTP Error 401" in error_msg or "Unauthorized" in error_msg:
-            error_msg = "Unauthorized access. Upload cookies to access private/restricted content."
-        elif "Unsupported URL" in error_msg:
-            error_msg = "This Twitter/X URL is not supported. Please make sure the tweet contains a video."
-        elif "Video unavailable" in error_msg:
-            error_msg = "Video is unavailable. It might be private, deleted, or from a protected account."
-        elif "Unable to extract" in error_msg or "Could not extract" in error_msg:
-            error_msg = "Unable to extract video. The tweet might not contain a video or might be restricted."
-        elif "network" in error_msg.lower() or "connection" in error_msg.lower():
-            error_msg = "Network connection error. Please check your internet connection and try again."
+        error_msg = classify_error(error_msg, FETCH_ERRORS)
         
         raise HTTPException(status_code=500, detail=error_msg)
 
+async def _batch_item(url: str) -> bytes:
+    """Serialized VideoResponse for url, or an error object instead of raising"""
+    try:
+        normalized_url = normalize_twitter_url(url)
+        if not is_valid_twitter_url(normalized_url):
+            return orjson.dumps({"success": False, "url": url, "error": "Invalid Twitter/X URL"})
+        return await get_video_response_body(normalized_url)
+    except HTTPException as e:
+        return orjson.dumps({"success": False, "url": url, "error": e.detail})
+    except Exception as e:
+        logger.error("Video extraction error: %s", e)
+        return orjson.dumps({"success": False, "url": url, "error": classify_error(str(e), FETCH_ERRORS)})
+
+@app.post("/video/fetch/batch")
+async def fetch_video_batch(request: BatchRequest):
+    """
+    📦 **Extract up to 20 Twitter/X videos in one call**
+    
+    - ⚡ URLs are extracted concurrently on the worker pool, so the call takes about
+      as long as the slowest extraction
+    - 📋 Returns a JSON array in request order: a `/video/fetch` response for each
+      URL that worked, or `{"success": false, "url": ..., "error": ...}`
+    """
+    bodies = await asyncio.gather(*map(_batch_item, request.urls))
+    # Items are already JSON, so splice them into the array instead of re-encoding
+    return Response(content=b'[' + b','.join(bodies) + b']', media_type='application/json')
+
 @app.post("/auth/cookies")
 async def upload_cookies(request: CookiesRequest):
     """
@@ -736,25 +1023,31 @@ async def upload_cookies(request: CookiesRequest):
 async def clear_cookies():
     """Clear stored cookies"""
     try:
-        if os.path.exists(COOKIES_FILE):
+        try:
             os.remove(COOKIES_FILE)
+        except FileNotFoundError:
+            pass
+        set_cookies_available(False)
         return {"message": "Cookies cleared successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error clearing cookies: {str(e)}")
 
 @app.get("/auth/status")
-async def auth_status():
+async def auth_status(request: Request, response: Response):
     """Check authentication status"""
-    has_cookies = os.path.exists(COOKIES_FILE)
-    cookie_count = 0
+    not_modified = cookies_not_modified(request, response)
+    if not_modified is not None:
+        return not_modified
     
-    if has_cookies:
-        try:
-            with open(COOKIES_FILE, 'r') as f:
-                lines = f.readlines()
-                cookie_count = len([line for line in lines if line.strip() and not line.startswith('#')])
-        except:
-            pass
+    # The count's stat() doubles as the existence check
+    has_cookies = True
+    cookie_count = 0
+    try:
+        cookie_count = count_active_cookies(COOKIES_FILE)
+    except FileNotFoundError:
+        has_cookies = False
+    except (OSError, ValueError):
+        pass
     
     return {
         "authenticated": has_cookies,
@@ -767,7 +1060,8 @@ async def cache_stats():
     """Get cache statistics"""
     return {
         "cache_size": len(video_cache),
-        "cache_enabled": True
+        "cache_enabled": True,
+        "disk_cache_enabled": bool(DISK_CACHE_PATH)
     }
 
 @app.post("/cache/clear")
@@ -776,34 +1070,25 @@ async def clear_cache():
     global video_cache
     cache_size = len(video_cache)
     video_cache.clear()
+    failed_cache.clear()
+    await asyncio.get_running_loop().run_in_executor(EXTRACTOR_POOL, disk_cache_clear)
     return {"message": f"Cache cleared. Removed {cache_size} entries."}
 
 @app.post("/cookies/add-raw", response_model=CookiesResponse)
 async def add_raw_cookies(request: RawCookiesRequest):
     """Add raw cookies and convert to Netscape format"""
     try:
-        import json
-        
         # Parse the raw cookies JSON
-        raw_cookies = json.loads(request.raw_cookies)
+        raw_cookies = orjson.loads(request.raw_cookies)
         
         if not isinstance(raw_cookies, list):
             raise ValueError("Cookies must be an array")
         
-        # Save raw cookies to temporary file
-        temp_file = 'temp_raw_cookies.json'
-        with open(temp_file, 'w', encoding='utf-8') as f:
-            json.dump(raw_cookies, f, indent=2)
-        
-        # Convert to Netscape format
-        from cookie_watcher import convert_raw_cookies_to_netscape
-        success = convert_raw_cookies_to_netscape(temp_file, COOKIES_FILE)
-        
-        # Clean up temp file
-        if os.path.exists(temp_file):
-            os.remove(temp_file)
-        
+        # Convert the already-parsed list straight to Netscape format
+        from cookie_watcher import convert_raw_cookies_list_to_netscape
+        success = convert_raw_cookies_list_to_netscape(raw_cookies, COOKIES_FILE)
         if success:
+            set_cookies_available(True)
             cookies_count = len(raw_cookies)
             return CookiesResponse(
                 success=True,
@@ -816,57 +1101,113 @@ async def add_raw_cookies(request: RawCookiesRequest):
                 message="Failed to convert cookies"
             )
             
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=400, detail="Invalid JSON format")
+    except orjson.JSONDecodeError as e:
+        # Same line/column details the stdlib parser would report
+        raise HTTPException(status_code=400, detail=f"Invalid JSON format: {e}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing cookies: {str(e)}")
 
+_AUTH_COOKIE_DOMAINS = (b'x.com', b'twitter.com')
+
+def auth_cookie_state(path: str) -> str:
+    """'present', 'expired' or 'missing' for the Twitter/X auth_token login cookie in a cookies file"""
+    now = time.time()
+    expired = False
+    with open(path, 'rb') as f:
+        for line in f.read().splitlines():
+            # Netscape format: domain, flag, path, secure, expiry, name, value
+            fields = line.split(b'\t')
+            if len(fields) != 7 or fields[5] != b'auth_token':
+                continue
+            domain = fields[0].removeprefix(b'#HttpOnly_').lstrip(b'.')
+            if not any(domain == d or domain.endswith(b'.' + d) for d in _AUTH_COOKIE_DOMAINS):
+                continue
+            expiry = _safe_int(fields[4])
+            if not expiry or expiry > now:  # 0 is a session cookie
+                return 'present'
+            expired = True
+    return 'expired' if expired else 'missing'
+
+_AUTH_COOKIE_MESSAGES = {
+    'expired': "Cookies are invalid or expired. Please update your cookies.",
+    'missing': "No Twitter/X login cookie (auth_token) found. Export cookies while logged in.",
+}
+
+COOKIE_PROBE_TTL = 300  # seconds a probe result is reused while cookies.txt is unchanged
+# cookies.txt mtime -> CookiesResponse of the last network probe, so repeated
+# validate clicks don't each cost a round-trip. Event loop only, like video_cache;
+# the TTL bounds how long a session revoked server-side can still look valid.
+_probe_results: TTLCache = TTLCache(maxsize=4, ttl=COOKIE_PROBE_TTL)
+
+def probe_cookies():
+    """Run a yt-dlp extraction with cookies.txt; raises if the cookies don't work"""
+    # Test cookies with a simple Twitter/X URL
+    test_url = "https://x.com/elonmusk/status/1"
+    
+    # This thread's cookie YoutubeDL, so the probe reuses its open connection. A
+    # throwaway instance would also save its jar over cookies.txt when closed,
+    # changing the mtime the result is cached under.
+    ydl = get_ydl(use_cookies=True)
+    if ydl is None:
+        raise FileNotFoundError(f"{COOKIES_FILE} was removed")
+    # Try to extract info - this will test if cookies work
+    ydl.extract_info(test_url, download=False)
+
 @app.post("/cookies/validate", response_model=CookiesResponse)
 async def validate_cookies():
-    """Validate current cookies by testing with yt-dlp"""
+    """Validate current cookies by testing with yt-dlp (reused while cookies.txt is unchanged)"""
     try:
-        if not os.path.exists(COOKIES_FILE):
+        _stat_cookies()  # no TTL lag here: the file may have just been replaced
+        stamp = cookies_mtime()
+        if stamp is None:
             return CookiesResponse(
                 success=False,
                 message="No cookies file found. Please add cookies first."
             )
         
-        # Test cookies with a simple Twitter/X URL
-        test_url = "https://x.com/elonmusk/status/1"
+        cached = _probe_results.get(stamp)
+        if cached is not None:
+            return cached
         
-        ydl_opts = {
-            'quiet': True,
-            'no_warnings': True,
-            'extract_flat': True,
-            'cookiefile': COOKIES_FILE,
-        }
+        # Without an unexpired auth_token the probe can only fail, so skip the network
+        state = auth_cookie_state(COOKIES_FILE)
+        if state != 'present':
+            return CookiesResponse(success=False, message=_AUTH_COOKIE_MESSAGES[state])
         
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                # Try to extract info - this will test if cookies work
-                info = ydl.extract_info(test_url, download=False)
-                
-            return CookiesResponse(
+            # Blocking network probe, so it runs on the extractor pool like every other yt-dlp call
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(EXTRACTOR_POOL, probe_cookies)
+            
+            result = CookiesResponse(
                 success=True,
                 message="Cookies are valid and working!"
             )
+        except FileNotFoundError:
+            return CookiesResponse(
+                success=False,
+                message="No cookies file found. Please add cookies first."
+            )
         except Exception as e:
             error_msg = str(e).lower()
             if "private" in error_msg or "protected" in error_msg:
-                return CookiesResponse(
+                result = CookiesResponse(
                     success=False,
                     message="Cookies are loaded but may not have sufficient permissions for private content"
                 )
             elif "login" in error_msg or "auth" in error_msg:
-                return CookiesResponse(
+                result = CookiesResponse(
                     success=False,
                     message="Cookies are invalid or expired. Please update your cookies."
                 )
             else:
-                return CookiesResponse(
+                result = CookiesResponse(
                     success=True,
                     message="Cookies are loaded (validation inconclusive but likely working)"
                 )
+        
+        _probe_results[stamp] = result
+        return result
                 
     except Exception as e:
         return CookiesResponse(
@@ -875,21 +1216,24 @@ async def validate_cookies():
         )
 
 @app.get("/cookies/status", response_model=CookiesResponse)
-async def get_cookies_status():
+async def get_cookies_status(request: Request, response: Response):
     """Get current cookies status"""
+    not_modified = cookies_not_modified(request, response)
+    if not_modified is not None:
+        return not_modified
+    
     try:
-        if not os.path.exists(COOKIES_FILE):
+        # Count lines in cookies file (approximate cookie count); its stat() doubles
+        # as the existence check
+        try:
+            cookies_count = count_active_cookies(COOKIES_FILE)
+        except FileNotFoundError:
             return CookiesResponse(
                 success=False,
                 message="No cookies file found",
                 cookies_count=0
             )
         
-        # Count lines in cookies file (approximate cookie count)
-        with open(COOKIES_FILE, 'r', encoding='utf-8') as f:
-            lines = [line.strip() for line in f.readlines() if line.strip() and not line.startswith('#')]
-            cookies_count = len(lines)
-        
         return CookiesResponse(
             success=True,
             message=f"Cookies file exists with {cookies_count} entries",
@@ -902,10 +1246,8 @@ async def get_cookies_status():
             message=f"Error reading cookies status: {str(e)}"
         )
 
-@app.get("/cookies/manager")
-async def cookie_manager():
-    """Cookie management interface"""
-    html_content = '''
+# The cookie manager page is static, so it is encoded (and gzipped) once at import
+COOKIE_MANAGER_HTML = '''
     <!DOCTYPE html>
     <html>
     <head>
@@ -932,7 +1274,7 @@ async def cookie_manager():
             <div class="section">
                 <h3>Current Cookie Status</h3>
                 <div id="status" class="status info">Loading...</div>
-                <button onclick="checkStatus()">Refresh Status</button>
+                <button id="statusBtn">Refresh Status</button>
             </div>
             
             <div class="section">
@@ -940,132 +1282,61 @@ async def cookie_manager():
                 <p>Paste your raw cookies JSON array here (from browser developer tools):</p>
                 <textarea id="rawCookies" placeholder='[{"domain":".x.com","name":"auth_token","value":"your_token_here",...}]'></textarea>
                 <br>
-                <button onclick="addCookies()">Add Cookies</button>
-                <button onclick="validateCookies()">Validate Cookies</button>
+                <button id="addBtn">Add Cookies</button>
+                <button id="validateBtn">Validate Cookies</button>
             </div>
             
             <div class="section">
                 <h3>Quick Test</h3>
                 <p>Test video extraction with current cookies:</p>
                 <input type="text" id="testUrl" placeholder="https://x.com/user/status/123..." style="width: 70%; padding: 8px;">
-                <button onclick="testVideo()">Test Video</button>
+                <button id="testBtn">Test Video</button>
             </div>
             
             <div id="result" class="status" style="display: none;"></div>
         </div>
         
-        <script>
-            async function checkStatus() {
-                const statusEl = document.getElementById('status');
-                statusEl.className = 'status loading';
-                statusEl.textContent = 'Checking status...';
-                
-                try {
-                    const response = await fetch('/cookies/status');
-                    const data = await response.json();
-                    
-                    if (data.success) {
-                        statusEl.className = 'status success';
-                        statusEl.textContent = `✅ ${data.message}`;
-                    } else {
-                        statusEl.className = 'status error';
-                        statusEl.textContent = `❌ ${data.message}`;
-                    }
-                } catch (error) {
-                    statusEl.className = 'status error';
-                    statusEl.textContent = `❌ Error: ${error.message}`;
-                }
-            }
-            
-            async function addCookies() {
-                const rawCookies = document.getElementById('rawCookies').value;
-                const resultEl = document.getElementById('result');
-                
-                if (!rawCookies.trim()) {
-                    showResult('error', 'Please paste your raw cookies JSON');
-                    return;
-                }
-                
-                showResult('loading', 'Adding cookies...');
-                
-                try {
-                    const response = await fetch('/cookies/add-raw', {
-                        method: 'POST',
-                        headers: { 'Content-Type': 'application/json' },
-                        body: JSON.stringify({ raw_cookies: rawCookies })
-                    });
-                    
-                    const data = await response.json();
-                    
-                    if (response.ok && data.success) {
-                        showResult('success', `✅ ${data.message}`);
-                        checkStatus(); // Refresh status
-                    } else {
-                        showResult('error', `❌ ${data.message || data.detail}`);
-                    }
-                } catch (error) {
-                    showResult('error', `❌ Error: ${error.message}`);
-                }
-            }
-            
-            async function validateCookies() {
-                showResult('loading', 'Validating cookies...');
-                
-                try {
-                    const response = await fetch('/cookies/validate', { method: 'POST' });
-                    const data = await response.json();
-                    
-                    if (data.success) {
-                        showResult('success', `✅ ${data.message}`);
-                    } else {
-                        showResult('error', `❌ ${data.message}`);
-                    }
-                } catch (error) {
-                    showResult('error', `❌ Error: ${error.message}`);
-                }
-            }
-            
-            async function testVideo() {
-                const url = document.getElementById('testUrl').value;
-                
-                if (!url.trim()) {
-                    showResult('error', 'Please enter a Twitter/X URL');
-                    return;
-                }
-                
-                showResult('loading', 'Testing video extraction...');
-                
-                try {
-                    const response = await fetch(`/test?url=${encodeURIComponent(url)}`);
-                    const data = await response.json();
-                    
-                    if (data.status === '✅ SUCCESS') {
-                        showResult('success', `✅ Success! Video: "${data.title}" (${data.quality})`);
-                    } else {
-                        showResult('error', `❌ ${data.error || data.status}`);
-                    }
-                } catch (error) {
-                    showResult('error', `❌ Error: ${error.message}`);
-                }
-            }
-            
-            function showResult(type, message) {
-                const resultEl = document.getElementById('result');
-                resultEl.className = `status ${type}`;
-                resultEl.textContent = message;
-                resultEl.style.display = 'block';
-            }
-            
-            // Load status on page load
-            checkStatus();
-        </script>
+        <script src="/static/manager.js"></script>
     </body>
     </html>
     '''
-    
-    return HTMLResponse(content=html_content)
+_COOKIE_MANAGER_BYTES = COOKIE_MANAGER_HTML.encode('utf-8')
+_COOKIE_MANAGER_ETAG = hashlib.blake2b(_COOKIE_MANAGER_BYTES, digest_size=16).hexdigest()
+# Separate validators for the two encodings of the same page
+COOKIE_MANAGER_ETAGS = {'plain': f'"{_COOKIE_MANAGER_ETAG}"', 'gzip': f'"{_COOKIE_MANAGER_ETAG}-gz"'}
+_COOKIE_MANAGER_HEADERS = {
+    'Cache-Control': 'public, max-age=300',
+    'Vary': 'Accept-Encoding',
+    # Lets the browser (or an HTTP/2 proxy) start fetching the script before the HTML is parsed
+    'Link': '</static/manager.js>; rel=preload; as=script',
+}
+COOKIE_MANAGER_PAGE = HTMLResponse(
+    content=_COOKIE_MANAGER_BYTES,
+    headers={**_COOKIE_MANAGER_HEADERS, 'ETag': COOKIE_MANAGER_ETAGS['plain']},
+)
+COOKIE_MANAGER_PAGE_GZIP = HTMLResponse(
+    content=gzip.compress(_COOKIE_MANAGER_BYTES, 9),
+    headers={**_COOKIE_MANAGER_HEADERS, 'ETag': COOKIE_MANAGER_ETAGS['gzip'], 'Content-Encoding': 'gzip'},
+)
+
+@app.get("/cookies/manager", response_class=HTMLResponse)
+async def cookie_manager(request: Request):
+    """Cookie management interface"""
+    encoding = 'gzip' if 'gzip' in request.headers.get('accept-encoding', '') else 'plain'
+    etag = COOKIE_MANAGER_ETAGS[encoding]
+    if etag_matches(request.headers.get('if-none-match', ''), etag):
+        return Response(status_code=304, headers={**_COOKIE_MANAGER_HEADERS, 'ETag': etag})
+    return COOKIE_MANAGER_PAGE_GZIP if encoding == 'gzip' else COOKIE_MANAGER_PAGE
 
-@app.get("/test", response_model=VideoResponse)
+# Fixed parts of the /test error responses, built once
+_TEST_INVALID_URL_BODY = orjson.dumps({"error": "Invalid Twitter/X URL", "example": "https://x.com/user/status/123456789"})
+_TEST_ERROR_HELP = {
+    "cookie_status": "/auth/status",
+    "upload_cookies": "Drop raw_cookies.json file in folder",
+    "docs": "/docs for full API testing"
+}
+
+@app.get("/test", responses={200: {"model": VideoResponse}})
 async def test_endpoint(url: str = "https://x.com/adh0005812/status/1672884416430096384"):
     """
     🧪 **Browser Test - Smart Detection & Best Quality Extraction**
@@ -1101,37 +1372,72 @@ async def test_endpoint(url: str = "https://x.com/adh0005812/status/167288441643
         normalized_url = normalize_twitter_url(url)
         
         if not is_valid_twitter_url(normalized_url):
-            return {"error": "Invalid Twitter/X URL", "example": "https://x.com/user/status/123456789"}
+            return Response(content=_TEST_INVALID_URL_BODY, media_type='application/json')
         
-        # Extract video info
-        video_data = extract_video_info(normalized_url)
+        # Same cache and in-flight extraction as /video/fetch
+        body = await get_video_response_body(normalized_url)
         
         # Return full response (same as API endpoint) for consistency
-        return VideoResponse(**video_data)
+        return Response(content=body, media_type='application/json')
         
     except Exception as e:
         error_msg = str(e)
         
         # Provide helpful error messages
-        if "HTTP Error 404" in error_msg or "Not Found" in error_msg:
-            error_msg = "Tweet not found or deleted"
-        elif "HTTP Error 403" in error_msg or "Forbidden" in error_msg:
-            error_msg = "Access forbidden - need authentication cookies"
-        elif "HTTP Error 401" in error_msg or "Unauthorized" in error_msg:
-            error_msg = "Unauthorized - upload cookies for private content"
-        elif "Unable to extract" in error_msg or "Could not extract" in error_msg:
-            error_msg = "Could not extract video from this URL"
+        error_msg = classify_error(error_msg, TEST_ERRORS)
         
-        return {
-            "status": "❌ ERROR",
-            "error": error_msg,
-            "url_tested": url,
-            "help": {
-                "cookie_status": "/auth/status",
-                "upload_cookies": "Drop raw_cookies.json file in folder",
-                "docs": "/docs for full API testing"
-            }
-        }
+        # Encoded directly, like the success body; the error shape isn't a VideoResponse
+        return Response(
+            content=orjson.dumps({
+                "status": "❌ ERROR",
+                "error": error_msg,
+                "url_tested": url,
+                "help": _TEST_ERROR_HELP,
+            }),
+            media_type='application/json',
+        )
+
+# Static API overview served by /, serialized once at import
+ROOT_INFO = {
+    "message": "🏆 Twitter Video Downloader API - Smart Detection Edition",
+    "version": "3.0.0",
+    "new_features_v3": {
+        "smart_detection": "Automatic adult/NSFW content detection - no manual input needed",
+        "unified_responses": "Test and main API endpoints return identical JSON structure",
+        "boolean_flag": "Added is_adult boolean field for easy programming logic",
+        "seamless_auth": "Transparent cookie-based authentication for private content"
+    },
+    "quality_features": {
+        "best_quality": "Automatically selects highest quality MP4 available",
+        "all_qualities": "Returns all MP4 options with download URLs",
+        "smart_ranking": "Quality selection by resolution → bitrate → fps",
+        "format_analysis": "Detailed logging of 15+ formats found"
+    },
+    "endpoints": {
+        "test": "GET /test (🧪 browser testable - identical to main API)",
+        "fetch_video": "POST /video/fetch (🏆 smart detection + best quality)",
+        "fetch_batch": "POST /video/fetch/batch (📦 up to 20 URLs at once)",
+        "upload_cookies": "POST /auth/cookies (🔒 private content access)",
+        "auth_status": "GET /auth/status (🔍 authentication check)",
+        "cache_stats": "GET /cache/stats (📊 performance metrics)",
+        "cookie_manager": "GET /cookies/manager (🍪 web interface)",
+        "add_raw_cookies": "POST /cookies/add-raw (📁 drag & drop cookies)",
+        "validate_cookies": "POST /cookies/validate (✅ test authentication)",
+        "cookies_status": "GET /cookies/status (🔄 cookie health check)"
+    },
+    "demo_urls": {
+        "public_content": "/test?url=https://x.com/user/status/123",
+        "auto_detection": "Any URL - system automatically detects content type"
+    },
+    "documentation": "/docs",
+    "cookie_manager": "/cookies/manager"
+}
+# Like the cookie manager page, one immutable response is shared by every request
+ROOT_RESPONSE = Response(
+    content=orjson.dumps(ROOT_INFO),
+    media_type='application/json',
+    headers={'Cache-Control': 'public, max-age=300'},
+)
 
 @app.get("/")
 async def root():
@@ -1156,39 +1462,7 @@ async def root():
     - Seamless cookie-based authentication
     - Real-time format analysis
     """
-    return {
-        "message": "🏆 Twitter Video Downloader API - Smart Detection Edition",
-        "version": "3.0.0",
-        "new_features_v3": {
-            "smart_detection": "Automatic adult/NSFW content detection - no manual input needed",
-            "unified_responses": "Test and main API endpoints return identical JSON structure",
-            "boolean_flag": "Added is_adult boolean field for easy programming logic",
-            "seamless_auth": "Transparent cookie-based authentication for private content"
-        },
-        "quality_features": {
-            "best_quality": "Automatically selects highest quality MP4 available",
-            "all_qualities": "Returns all MP4 options with download URLs",
-            "smart_ranking": "Quality selection by resolution → bitrate → fps",
-            "format_analysis": "Detailed logging of 15+ formats found"
-        },
-        "endpoints": {
-            "test": "GET /test (🧪 browser testable - identical to main API)",
-            "fetch_video": "POST /video/fetch (🏆 smart detection + best quality)",
-            "upload_cookies": "POST /auth/cookies (🔒 private content access)",
-            "auth_status": "GET /auth/status (🔍 authentication check)",
-            "cache_stats": "GET /cache/stats (📊 performance metrics)",
-            "cookie_manager": "GET /cookies/manager (🍪 web interface)",
-            "add_raw_cookies": "POST /cookies/add-raw (📁 drag & drop cookies)",
-            "validate_cookies": "POST /cookies/validate (✅ test authentication)",
-            "cookies_status": "GET /cookies/status (🔄 cookie health check)"
-        },
-        "demo_urls": {
-            "public_content": "/test?url=https://x.com/user/status/123",
-            "auto_detection": "Any URL - system automatically detects content type"
-        },
-        "documentation": "/docs",
-        "cookie_manager": "/cookies/manager"
-    }
+    return ROOT_RESPONSE
 
 if __name__ == "__main__":
     import uvicorn
@@ -1198,6 +1472,9 @@ if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8000))
     host = "0.0.0.0"
     
+    # LOG_LEVEL=DEBUG shows per-format details; WARNING keeps production quiet
+    logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO").upper(), format="%(message)s")
+    
     print("🚀 Starting Twitter Video Downloader API...")
     print(f"📍 Server will be available at: http://{host}:{port}")
     print(f"🍪 Cookie Manager: http://{host}:{port}/cookies/manager")
@@ -1,46 +1,87 @@
 import os
+import logging
+import select
+import selectors
 import subprocess
 import threading
 import time
 import signal
+import socket
 import sys
 from cookie_watcher import start_cookie_watcher
 
+# Relay the API server's output with an [API] prefix. PREFIX_API_OUTPUT=0 lets the
+# server write straight to this terminal instead, with no pipe or relay thread.
+PREFIX_API_OUTPUT = os.environ.get('PREFIX_API_OUTPUT', '1') != '0'
+API_PORT = int(os.environ.get('PORT', 8000))  # main.py reads the same variable
+API_STARTUP_TIMEOUT = 10  # seconds to wait for the API server to accept connections
+API_ARGV = (sys.executable, "main.py")
+STOP_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+# Banners, each written in one go rather than a print() per line
+RULE = "=" * 60
+TITLE_BANNER = f"{RULE}\n🎬 Twitter Video Downloader - Full Service\n{RULE}\n"
+RUNNING_BANNER = f"""
+{RULE}
+🎉 ALL SERVICES RUNNING!
+{RULE}
+📡 API Server: http://localhost:{API_PORT}
+📚 API Docs: http://localhost:{API_PORT}/docs
+🔍 Cookie Watcher: Active
+
+📋 COOKIE USAGE:
+   1. Export cookies from your browser
+   2. Save as raw_cookies.json in this folder
+   3. File will auto-convert to cookies.txt
+   4. API will use new cookies automatically
+
+🔞 ADULT CONTENT:
+   • Set is_adult_content: true in API requests
+   • Upload Twitter/X cookies for access
+
+⏹️  Press Ctrl+C to stop all services
+{RULE}
+"""
+
 class ServiceManager:
     """Manage both API server and cookie watcher"""
     
     def __init__(self):
         self.api_process = None
+        self._api_pidfd = None
+        self._api_fd = None  # the API's output pipe while we relay it
+        self._api_pending = b''  # partial last line of that output
         self.watcher_thread = None
-        self.running = True
+        # Set once on shutdown; the main thread's selector and the watcher wait on it
+        self._stop_event = threading.Event()
         
     def start_api_server(self):
         """Start the FastAPI server"""
         try:
             print("🚀 Starting FastAPI server...")
-            self.api_process = subprocess.Popen(
-                [sys.executable, "main.py"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True,
-                bufsize=1
-            )
-            
-            # Monitor API output
-            def monitor_api():
-                while self.running and self.api_process:
-                    try:
-                        line = self.api_process.stdout.readline()
-                        if line:
-                            print(f"[API] {line.strip()}")
-                        elif self.api_process.poll() is not None:
-                            break
-                    except:
-                        break
+            if PREFIX_API_OUTPUT:
+                self.api_process = subprocess.Popen(
+                    API_ARGV,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    bufsize=0  # raw bytes; relay_api_output does its own chunking
+                )
+                self._api_fd = self.api_process.stdout.fileno()
+                os.set_blocking(self._api_fd, False)  # relay reads never stall the main loop
+            else:
+                sys.stdout.flush()  # keep our banner ahead of the child's output
+                self.api_process = subprocess.Popen(API_ARGV)
+            # A pidfd becomes readable when the child exits, so shutdown can block on
+            # it instead of Popen.wait's sleep-and-poll loop (Linux 5.3+ only)
+            try:
+                self._api_pidfd = os.pidfd_open(self.api_process.pid)
+            except (AttributeError, OSError):
+                self._api_pidfd = None
             
-            threading.Thread(target=monitor_api, daemon=True).start()
-            time.sleep(2)  # Give server time to start
-            print("✅ FastAPI server started on http://localhost:8000")
+            if self.wait_api_ready():
+                print(f"✅ FastAPI server started on http://localhost:{API_PORT}")
+            elif not self._stop_event.is_set():
+                print("❌ FastAPI server did not start accepting connections")
             
         except Exception as e:
             print(f"❌ Error starting API server: {e}")
@@ -52,9 +93,9 @@ class ServiceManager:
             
             def watcher_worker():
                 try:
-                    start_cookie_watcher('.')
+                    start_cookie_watcher('.', stop_event=self._stop_event)
                 except Exception as e:
-                    if self.running:
+                    if not self._stop_event.is_set():
                         print(f"❌ Cookie watcher error: {e}")
             
             self.watcher_thread = threading.Thread(target=watcher_worker, daemon=True)
@@ -64,65 +105,148 @@ class ServiceManager:
         except Exception as e:
             print(f"❌ Error starting cookie watcher: {e}")
     
+    def relay_api_output(self):
+        """Print the API output that is ready to read, prefixed with [API]; call when the pipe is readable"""
+        # Drain everything buffered in 64 KiB reads and print the complete lines
+        # together, instead of a readline() per line
+        chunks = [self._api_pending]
+        eof = False
+        while True:
+            try:
+                chunk = os.read(self._api_fd, 65536)
+            except BlockingIOError:
+                break  # drained for now
+            except (OSError, ValueError):
+                chunk = b''
+            if not chunk:
+                eof = True
+                break
+            chunks.append(chunk)
+        *lines, self._api_pending = b''.join(chunks).split(b'\n')
+        if lines:
+            # One decode for the whole batch, then prefix each line
+            text = b'\n'.join(lines).decode('utf-8', 'replace')
+            sys.stdout.write(''.join(f"[API] {line.strip()}\n" for line in text.split('\n')))
+            sys.stdout.flush()
+        if eof:
+            # The server exited; flush its unterminated last line and stop relaying
+            if self._api_pending.strip():
+                print(f"[API] {self._api_pending.strip().decode('utf-8', 'replace')}")
+            self._api_fd = None
+    
+    def pause_relaying(self, timeout):
+        """Sleep up to timeout seconds, relaying API output that arrives meanwhile"""
+        if self._api_fd is None:
+            time.sleep(timeout)
+        elif select.select([self._api_fd], [], [], timeout)[0]:
+            self.relay_api_output()
+    
+    def serve_until_stopped(self):
+        """Relay API output until SIGINT/SIGTERM, all on the main thread"""
+        # Signal handlers run between bytecodes, but select() only notices them if a
+        # byte arrives on an fd it watches, so route signals through a wakeup pipe
+        wake_r, wake_w = os.pipe()
+        os.set_blocking(wake_w, False)
+        previous_wakeup_fd = signal.set_wakeup_fd(wake_w)
+        try:
+            with selectors.DefaultSelector() as sel:
+                sel.register(wake_r, selectors.EVENT_READ)
+                if self._api_fd is not None:
+                    sel.register(self._api_fd, selectors.EVENT_READ)
+                while not self._stop_event.is_set():
+                    for key, _ in sel.select():
+                        if key.fd == wake_r:
+                            os.read(wake_r, 512)  # the handler has already set the stop event
+                            continue
+                        self.relay_api_output()
+                        if self._api_fd is None:
+                            # The server exited on its own; keep waiting for Ctrl+C
+                            sel.unregister(key.fd)
+        finally:
+            signal.set_wakeup_fd(previous_wakeup_fd)
+            os.close(wake_r)
+            os.close(wake_w)
+    
+    def wait_api_ready(self, timeout=API_STARTUP_TIMEOUT):
+        """Poll until the API server accepts connections; False on its exit, timeout or a stop request"""
+        deadline = time.monotonic() + timeout
+        delay = 0.001
+        while time.monotonic() < deadline:
+            if self._stop_event.is_set() or self.api_process.poll() is not None:
+                return False
+            with socket.socket() as sock:
+                sock.settimeout(0.05)
+                if sock.connect_ex(('127.0.0.1', API_PORT)) == 0:
+                    return True
+            self.pause_relaying(delay)
+            delay = min(delay * 2, 0.025)
+        return False
+    
+    def wait_api_exit(self, timeout):
+        """Wait up to timeout seconds for the API server to exit, then reap it"""
+        if self._api_pidfd is None:
+            return self.api_process.wait(timeout=timeout)
+        with selectors.DefaultSelector() as sel:
+            sel.register(self._api_pidfd, selectors.EVENT_READ)
+            if not sel.select(timeout):
+                raise subprocess.TimeoutExpired(self.api_process.args, timeout)
+        return self.api_process.wait()
+    
     def stop_services(self):
         """Stop all services"""
         print("\n🛑 Stopping services...")
-        self.running = False
+        self._stop_event.set()
         
         if self.api_process:
             try:
                 self.api_process.terminate()
-                self.api_process.wait(timeout=5)
+                self.wait_api_exit(timeout=5)
                 print("✅ API server stopped")
-            except:
+            except subprocess.TimeoutExpired:
                 try:
                     self.api_process.kill()
                     print("⚠️ API server force stopped")
-                except:
+                except OSError:
                     pass
         
+        # Relay what the server logged while shutting down. Its exit closed the pipe,
+        # so this normally ends at EOF; the timeout covers anything else holding it
+        while self._api_fd is not None and select.select([self._api_fd], [], [], 1.0)[0]:
+            self.relay_api_output()
+        
+        if self._api_pidfd is not None:
+            os.close(self._api_pidfd)
+            self._api_pidfd = None
+        
+        # The watcher saw the stop event too; give it a moment to release its watch
+        if self.watcher_thread is not None:
+            self.watcher_thread.join(timeout=2.0)
+        
         print("✅ All services stopped")
     
     def run(self):
         """Main run method"""
-        print("=" * 60)
-        print("🎬 Twitter Video Downloader - Full Service")
-        print("=" * 60)
+        sys.stdout.write(TITLE_BANNER)
         
-        # Setup signal handlers
+        # Setup signal handlers; the finally below does the actual shutdown
         def signal_handler(signum, frame):
-            self.stop_services()
-            sys.exit(0)
+            self._stop_event.set()
         
-        signal.signal(signal.SIGINT, signal_handler)
-        signal.signal(signal.SIGTERM, signal_handler)
+        for sig in STOP_SIGNALS:
+            signal.signal(sig, signal_handler)
         
         try:
             # Start services
             self.start_api_server()
-            time.sleep(1)
-            self.start_cookie_watcher()
+            if self._stop_event.is_set():
+                return  # stopped during startup; the finally tears the server down
+            self.start_cookie_watcher()  # independent of the API, so no wait in between
             
-            print("\n" + "=" * 60)
-            print("🎉 ALL SERVICES RUNNING!")
-            print("=" * 60)
-            print("📡 API Server: http://localhost:8000")
-            print("📚 API Docs: http://localhost:8000/docs") 
-            print("🔍 Cookie Watcher: Active")
-            print("\n📋 COOKIE USAGE:")
-            print("   1. Export cookies from your browser")
-            print("   2. Save as raw_cookies.json in this folder")
-            print("   3. File will auto-convert to cookies.txt")
-            print("   4. API will use new cookies automatically")
-            print("\n🔞 ADULT CONTENT:")
-            print("   • Set is_adult_content: true in API requests")
-            print("   • Upload Twitter/X cookies for access")
-            print("\n⏹️  Press Ctrl+C to stop all services")
-            print("=" * 60)
+            sys.stdout.write(RUNNING_BANNER)
+            sys.stdout.flush()
             
-            # Keep running
-            while self.running:
-                time.sleep(1)
+            # Keep running (and relaying API output) until a signal arrives
+            self.serve_until_stopped()
                 
         except KeyboardInterrupt:
             pass
@@ -130,5 +254,7 @@ class ServiceManager:
             self.stop_services()
 
 if __name__ == "__main__":
+    # The embedded cookie watcher reports through logging
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     manager = ServiceManager()
     manager.run() 
\ No newline at end of file
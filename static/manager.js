@@ -0,0 +1,199 @@
+// Only the last call within `delay` ms runs (trailing edge)
+const debounce = (fn, delay = 400) => {
+    let timer;
+    return (...args) => {
+        clearTimeout(timer);
+        timer = setTimeout(() => fn(...args), delay);
+    };
+};
+
+// Drop calls while the previous one is still waiting on the server
+const exclusive = (fn) => {
+    let inFlight = false;
+    return async (...args) => {
+        if (inFlight) return;
+        inFlight = true;
+        try {
+            return await fn(...args);
+        } finally {
+            inFlight = false;
+        }
+    };
+};
+
+// At most one call per `limit` ms (leading edge)
+const throttle = (fn, limit) => {
+    let last = 0;
+    return (...args) => {
+        const now = Date.now();
+        if (now - last >= limit) {
+            last = now;
+            fn(...args);
+        }
+    };
+};
+
+async function checkStatus() {
+    const statusEl = document.getElementById('status');
+    statusEl.className = 'status loading';
+    statusEl.textContent = 'Checking status...';
+
+    try {
+        const response = await fetch('/cookies/status');
+        const data = await response.json();
+
+        if (data.success) {
+            statusEl.className = 'status success';
+            statusEl.textContent = `✅ ${data.message}`;
+        } else {
+            statusEl.className = 'status error';
+            statusEl.textContent = `❌ ${data.message}`;
+        }
+    } catch (error) {
+        statusEl.className = 'status error';
+        statusEl.textContent = `❌ Error: ${error.message}`;
+    }
+}
+
+async function addCookies() {
+    const rawCookies = document.getElementById('rawCookies').value;
+    const resultEl = document.getElementById('result');
+
+    if (!rawCookies.trim()) {
+        showResult('error', 'Please paste your raw cookies JSON');
+        return;
+    }
+
+    showResult('loading', 'Adding cookies...');
+
+    try {
+        const response = await fetch('/cookies/add-raw', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ raw_cookies: rawCookies })
+        });
+
+        const data = await response.json();
+
+        if (response.ok && data.success) {
+            showResult('success', `✅ ${data.message}`);
+            checkStatusThrottled(); // Refresh status
+        } else {
+            showResult('error', `❌ ${data.message || data.detail}`);
+        }
+    } catch (error) {
+        showResult('error', `❌ Error: ${error.message}`);
+    }
+}
+
+async function validateCookies() {
+    showResult('loading', 'Validating cookies...');
+
+    try {
+        const response = await fetch('/cookies/validate', { method: 'POST' });
+        const data = await response.json();
+
+        if (data.success) {
+            showResult('success', `✅ ${data.message}`);
+        } else {
+            showResult('error', `❌ ${data.message}`);
+        }
+    } catch (error) {
+        showResult('error', `❌ Error: ${error.message}`);
+    }
+}
+
+// Stale-while-revalidate: a result from the last minute is shown at once
+// while the request still runs in the background to refresh it
+const TEST_CACHE_TTL = 60000;
+
+function readTestCache(key) {
+    try {
+        const entry = JSON.parse(sessionStorage.getItem(key));
+        return entry && Date.now() - entry.ts < TEST_CACHE_TTL ? entry.data : null;
+    } catch (error) {
+        return null;
+    }
+}
+
+function writeTestCache(key, data) {
+    try {
+        sessionStorage.setItem(key, JSON.stringify({ ts: Date.now(), data }));
+    } catch (error) {
+        // Storage full or disabled; caching is best effort
+    }
+}
+
+function showTestResult(data) {
+    // /test returns the VideoResponse body on success, an error dict otherwise
+    if (data.success) {
+        // expires_at is epoch seconds; formatting it is left to the browser
+        const expires = new Date(data.expires_at * 1000).toLocaleString();
+        showResult('success', `✅ Success! Video: "${data.title}" (${data.quality}), link valid until ${expires}`);
+    } else {
+        showResult('error', `❌ ${data.error || data.detail || data.status}`);
+    }
+}
+
+// Only the latest test matters; starting a new one aborts the previous fetch
+let testAbort = null;
+
+async function testVideo() {
+    const url = document.getElementById('testUrl').value.trim();
+
+    if (!url) {
+        showResult('error', 'Please enter a Twitter/X URL');
+        return;
+    }
+
+    const cacheKey = `test:${url}`;
+    const cached = readTestCache(cacheKey);
+    if (cached) {
+        showTestResult(cached);
+    } else {
+        showResult('loading', 'Testing video extraction...');
+    }
+
+    testAbort?.abort();
+    const controller = new AbortController();
+    testAbort = controller;
+
+    try {
+        const response = await fetch(`/test?url=${encodeURIComponent(url)}`, { signal: controller.signal });
+        const data = await response.json();
+
+        if (data.success) {
+            writeTestCache(cacheKey, data);
+        }
+        showTestResult(data);
+    } catch (error) {
+        // Aborted requests were superseded by a newer test; keep showing the
+        // cached result if the refresh fails
+        if (error.name !== 'AbortError' && !cached) {
+            showResult('error', `❌ Error: ${error.message}`);
+        }
+    } finally {
+        if (testAbort === controller) {
+            testAbort = null;
+        }
+    }
+}
+
+function showResult(type, message) {
+    const resultEl = document.getElementById('result');
+    resultEl.className = `status ${type}`;
+    resultEl.textContent = message;
+    resultEl.style.display = 'block';
+}
+
+const checkStatusThrottled = throttle(checkStatus, 2000);
+
+// Each click spawns server work (a yt-dlp extraction for test/validate),
+// so rapid clicks collapse into one request at a time
+document.getElementById('statusBtn').addEventListener('click', checkStatusThrottled);
+document.getElementById('addBtn').addEventListener('click', debounce(exclusive(addCookies)));
+document.getElementById('validateBtn').addEventListener('click', debounce(exclusive(validateCookies)));
+document.getElementById('testBtn').addEventListener('click', debounce(testVideo));  // aborts its own stale request
+
+// Load status on page load (unthrottled so the first paint always fetches)
+checkStatus();